@@ -1,3 +1,46 @@
+import numpy as np
+
+
+# Place values for the digits of a rotation distance, indexed by digits-to-the-right
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+def parse_rotations(data):
+    """
+    Split raw rotation bytes such as b"L68\\nR48\\n" into direction and distance arrays.
+    
+    The whole buffer is viewed as uint8 and every rotation is decoded at
+    once: each digit is weighted by the power of ten for its distance to the
+    end of its run, and np.add.reduceat sums those per rotation, so no Python
+    string or int is created per line. Distances must fit in an int64.
+    
+    Returns:
+        directions: int64 array, -1 for L and +1 for R
+        distances: int64 array of click counts
+    """
+    buf = np.frombuffer(data + b'\n', dtype=np.uint8)
+    positions = np.arange(buf.size)
+    is_digit = (buf >= ord('0')) & (buf <= ord('9'))
+    is_letter = (buf == ord('L')) | (buf == ord('R'))
+    
+    # A rotation is an L or R immediately followed by at least one digit
+    starts = np.flatnonzero(is_letter[:-1] & is_digit[1:])
+    
+    # Each digit run is bounded by the nearest non-digits on either side;
+    # only runs that open right after a letter are distances
+    non_digit = np.where(is_digit, -1, positions)
+    run_start = np.maximum.accumulate(non_digit) + 1
+    run_end = np.minimum.accumulate(np.where(is_digit, buf.size, positions)[::-1])[::-1]
+    keep = is_digit & is_letter[run_start - 1]
+    
+    place = np.where(keep, run_end - positions - 1, 0)
+    values = np.where(keep, (buf.astype(np.int64) - ord('0')) * _POW10[place], 0)
+    
+    directions = np.where(buf[starts] == ord('L'), -1, 1).astype(np.int64)
+    distances = np.add.reduceat(values, starts) if starts.size else np.zeros(0, dtype=np.int64)
+    return directions, distances
+
+
 def solve_safe(filename, count_clicks=False):
     """
     Solve the safe dial puzzle.
@@ -10,29 +53,23 @@ def solve_safe(filename, count_clicks=False):
     Returns:
         Number of times the dial points at 0
     """
-    position = 50
-    count = 0
-    
-    with open(filename) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-                
-            direction = line[0]
-            distance = int(line[1:])
-            step = -1 if direction == 'L' else 1
-            
-            # Always loop through each click
-            for i in range(distance):
-                position = (position + step) % 100
-                # In click mode: count every zero
-                # In normal mode: only count if this is the final position
-                if position == 0:
-                    if count_clicks or i == distance - 1:
-                        count += 1
-    
-    return count
+    # Read the file once and decode every rotation in one vectorised pass
+    with open(filename, 'rb') as f:
+        directions, distances = parse_rotations(f.read())
+    
+    # Dial position after each rotation, and before it (the previous end)
+    ends = (50 + np.cumsum(directions * distances)) % 100
+    starts = np.concatenate(([50], ends[:-1]))
+    
+    # In normal mode: only count rotations that end on 0 (and actually move)
+    if not count_clicks:
+        return int(np.count_nonzero((ends == 0) & (distances > 0)))
+    
+    # In click mode: a right turn of d from p passes 0 (p + d) // 100 times;
+    # a left turn is the same from the mirrored position, 100 - p (or 0 at p = 0)
+    mirrored = np.where(starts == 0, 0, 100 - starts)
+    offsets = np.where(directions > 0, starts, mirrored)
+    return int(((offsets + distances) // 100).sum())
 
 
 if __name__ == '__main__':
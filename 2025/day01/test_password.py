@@ -0,0 +1,94 @@
+import unittest
+from password import parse_rotations, solve_safe
+import tempfile
+import os
+
+
+class TestParseRotations(unittest.TestCase):
+    """Test decoding raw rotation bytes into direction and distance arrays."""
+    
+    def assertParsed(self, data, directions, distances):
+        """Helper to compare both decoded arrays with plain lists."""
+        parsed_directions, parsed_distances = parse_rotations(data)
+        self.assertEqual(parsed_directions.tolist(), directions)
+        self.assertEqual(parsed_distances.tolist(), distances)
+    
+    def test_example_lines(self):
+        """Test the first rotations of the worked example."""
+        self.assertParsed(b"L68\nL30\nR48\n", [-1, -1, 1], [68, 30, 48])
+    
+    def test_crlf_and_blank_lines(self):
+        """Test that Windows line endings and blank lines are ignored."""
+        self.assertParsed(b"L68\r\n\r\nR48\r\n\n", [-1, 1], [68, 48])
+    
+    def test_missing_trailing_newline(self):
+        """Test that the last rotation is read without a final newline."""
+        self.assertParsed(b"R5\nL12", [1, -1], [5, 12])
+    
+    def test_zero_and_multi_digit_distances(self):
+        """Test zero, leading-zero and multiples-of-100 distances."""
+        self.assertParsed(b"R0\nL007\nR100\nL1000\n", [1, -1, 1, -1], [0, 7, 100, 1000])
+    
+    def test_empty_input(self):
+        """Test that input without rotations gives empty arrays."""
+        self.assertParsed(b"", [], [])
+        self.assertParsed(b"\n\n", [], [])
+    
+    def test_letter_without_digits_skipped(self):
+        """Test that a bare direction letter is not a rotation."""
+        self.assertParsed(b"L\nR3\n", [1], [3])
+
+
+
+class TestSolveSafe(unittest.TestCase):
+    """Test both counting methods against hand-checked rotation sequences."""
+    
+    def setUp(self):
+        """Create a temporary directory for test files."""
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up temporary test files."""
+        for file in os.listdir(self.test_dir):
+            os.remove(os.path.join(self.test_dir, file))
+        os.rmdir(self.test_dir)
+    
+    def create_test_file(self, content):
+        """Helper to create a temporary test file from bytes."""
+        fd, path = tempfile.mkstemp(dir=self.test_dir)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        return path
+    
+    def assertSolved(self, content, ends_on_zero, clicks_through_zero):
+        """Helper to check the normal and click-counting answers for one input."""
+        path = self.create_test_file(content)
+        self.assertEqual(solve_safe(path), ends_on_zero)
+        self.assertEqual(solve_safe(path, count_clicks=True), clicks_through_zero)
+    
+    def test_example(self):
+        """Test the worked example from the puzzle."""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'example.txt')
+        self.assertEqual(solve_safe(path), 3)
+        self.assertEqual(solve_safe(path, count_clicks=True), 6)
+    
+    def test_crlf_and_blank_lines(self):
+        """Test the example with Windows line endings and blank lines."""
+        content = b"L68\r\nL30\r\n\r\nR48\r\nL5\r\nR60\r\n\nL55\r\nL1\r\nL99\r\nR14\r\nL82\r\n"
+        self.assertSolved(content, 3, 6)
+    
+    def test_zero_distance_rotations(self):
+        """Test that standing still on 0 neither ends on nor clicks through 0 again."""
+        self.assertSolved(b"L50\nR0\nL0\nR0\n", 1, 1)
+    
+    def test_left_turns_starting_at_zero(self):
+        """Test that leaving 0 to the left does not count the starting position."""
+        self.assertSolved(b"L50\nL5\nL100\nR5\nL105\n", 2, 4)
+    
+    def test_multiples_of_one_hundred(self):
+        """Test full turns count one click through 0 per hundred."""
+        self.assertSolved(b"R50\nR100\nL200\nR300\nL50\nL100\n", 4, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,171 @@
+import mmap
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Powers of ten covering every ID that fits in a 64-bit integer
+POW10 = [10 ** i for i in range(21)]
+
+_RANGE_RE = re.compile(rb'(\d+)-(\d+)')
+
+# Minimum number of IDs across all ranges before the NumPy solver uses a process pool
+PARALLEL_THRESHOLD = 5_000_000
+
+# IDs per array in the NumPy range scan, small enough to stay in L2 cache
+NUMPY_CHUNK = 1 << 16
+
+# Ranges ending below this are summed by the Numba scan; every invalid ID sum stays inside an int64
+NUMBA_SCAN_LIMIT = 10 ** 12
+
+
+def digit_count(num):
+    """
+    Count the decimal digits of a non-negative integer without building a string.
+    
+    POW10[i] is the smallest (i+1)-digit number, so a C-level binary search
+    over the table gives the digit count directly.
+    """
+    if num < 10:
+        return 1
+    if num >= POW10[-1]:
+        return len(str(num))
+    return bisect_right(POW10, num)
+
+
+def pow10(exponent):
+    """10**exponent, read from POW10 when the table covers it."""
+    return POW10[exponent] if exponent < len(POW10) else 10 ** exponent
+
+
+@lru_cache(maxsize=None)
+def pattern_lengths(length):
+    """Proper divisors of length: every head size that tiles a length-digit ID at least twice."""
+    return tuple(k for k in range(1, length // 2 + 1) if length % k == 0)
+
+
+@lru_cache(maxsize=None)
+def band_repunits(length, repeating_pattern=False):
+    """
+    Repunits whose multiples are the invalid IDs with the given digit count.
+    
+    A length-digit ID repeating a k-digit head is a multiple of
+    (10^length - 1) / (10^k - 1). Part One only allows k = length / 2;
+    Part Two allows every proper divisor k of length. The tuple depends on
+    nothing but the digit count, so it is computed once per length.
+    """
+    if repeating_pattern:
+        pattern_lens = pattern_lengths(length)
+    else:
+        pattern_lens = [length // 2] if length % 2 == 0 else []
+    return tuple((pow10(length) - 1) // (pow10(k) - 1) for k in pattern_lens)
+
+
+def _is_invalid_id_kernel(num, repeating_pattern):
+    """
+    Integer-only repetition check, written so Numba can compile it.
+    
+    Only valid for 0 <= num < 10**18 so every intermediate fits in an int64.
+    """
+    length = 1
+    t = num // 10
+    while t:
+        t //= 10
+        length += 1
+    
+    top = 1
+    for _ in range(length):
+        top *= 10
+    
+    for pattern_len in range(1, length // 2 + 1):
+        if length % pattern_len != 0:
+            continue
+        if not repeating_pattern and pattern_len * 2 != length:
+            continue
+        step = 1
+        for _ in range(pattern_len):
+            step *= 10
+        if num % ((top - 1) // (step - 1)) == 0:
+            return True
+    return False
+
+
+if njit is not None:
+    _is_invalid_id_nb = njit('boolean(int64, boolean)', cache=True)(_is_invalid_id_kernel)
+else:
+    _is_invalid_id_nb = None
+
+
+def _scan_range_kernel(start, end, repeating_pattern):
+    """
+    Sum and count the invalid IDs in [start, end], written so Numba can compile it.
+    
+    Walks the multiples of each band repunit like invalid_ids_in_range, but
+    skips a multiple when an earlier repunit of the band already divides it,
+    so shared IDs are counted once without building a set.
+    Only valid for 1 <= start and end < NUMBA_SCAN_LIMIT.
+    """
+    total = 0
+    count = 0
+    top = 1
+    length = 0
+    while top <= start:
+        top *= 10
+        length += 1
+    
+    while start <= end:
+        band_end = min(end, top - 1)
+        reps = []
+        for pattern_len in range(1, length // 2 + 1):
+            if length % pattern_len != 0:
+                continue
+            if not repeating_pattern and pattern_len * 2 != length:
+                continue
+            step = 1
+            for _ in range(pattern_len):
+                step *= 10
+            reps.append((top - 1) // (step - 1))
+        
+        for j in range(len(reps)):
+            rep = reps[j]
+            for num in range((start + rep - 1) // rep * rep, band_end + 1, rep):
+                shared = False
+                for i in range(j):
+                    if num % reps[i] == 0:
+                        shared = True
+                        break
+                if not shared:
+                    total += num
+                    count += 1
+        
+        start = band_end + 1
+        top *= 10
+        length += 1
+    return total, count
+
+
+if njit is not None:
+    _scan_range_nb = njit('UniTuple(int64, 2)(int64, int64, boolean)', cache=True)(_scan_range_kernel)
+else:
+    _scan_range_nb = None
+
+
+@lru_cache(maxsize=8192)
 def is_invalid_id(num, repeating_pattern=False):
     """
     Check if a number is an invalid ID.
     
+    An n-digit number made of a k-digit head repeated n/k times equals
+    head * (1 + 10^k + 10^2k + ...), and any n-digit multiple of that repunit
+    has a k-digit head, so the check is a single modulo per pattern length.
+    
     Args:
         num: Integer to check
         repeating_pattern: If True, check for pattern repeated at least twice (Part Two)
@@ -10,25 +174,65 @@ def is_invalid_id(num, repeating_pattern=False):
     Returns:
         True if invalid (repeated pattern), False otherwise
     """
-    s = str(num)
-    length = len(s)
+    if _is_invalid_id_nb is not None and 0 <= num < POW10[18]:
+        return _is_invalid_id_nb(num, repeating_pattern)
     
-    if repeating_pattern:
-        # Check if string is made of a pattern repeated at least twice
-        # Try all possible pattern lengths from 1 to length//2
-        for pattern_len in range(1, length // 2 + 1):
-            if length % pattern_len == 0:
-                pattern = s[:pattern_len]
-                repetitions = length // pattern_len
-                if repetitions >= 2 and pattern * repetitions == s:
-                    return True
-        return False
-    else:
-        # Part One: must be even length and first half equals second half
-        if length % 2 != 0:
-            return False
-        mid = length // 2
-        return s[:mid] == s[mid:]
+    # Repunits for this digit count are cached, so each candidate costs one modulo
+    for rep in band_repunits(digit_count(num), repeating_pattern):
+        if num % rep == 0:
+            return True
+    return False
+
+
+def invalid_ids_in_range(start, end, repeating_pattern=False):
+    """
+    List the invalid IDs in the inclusive range [start, end] in ascending order.
+    
+    The range is split into bands of constant digit count n. Within a band the
+    IDs repeating a k-digit head are exactly the multiples of the repunit
+    (10^n - 1) / (10^k - 1), so each is produced by a single range() step
+    instead of testing every integer in between.
+    
+    Args:
+        start: Smallest ID to include
+        end: Largest ID to include
+        repeating_pattern: If True, use Part Two rules (pattern repeated at least twice)
+    
+    Returns:
+        Sorted list of distinct invalid IDs
+    """
+    invalid = []
+    start = max(start, 1)
+    
+    while start <= end:
+        length = digit_count(start)
+        band_end = min(end, pow10(length) - 1)
+        
+        band = set()
+        for rep in band_repunits(length, repeating_pattern):
+            first = -(-start // rep) * rep
+            band.update(range(first, band_end + 1, rep))
+        invalid.extend(sorted(band))
+        
+        start = band_end + 1
+    
+    return invalid
+
+
+def read_ranges(filename):
+    """
+    Read (start, end) pairs from a comma-separated range file.
+    
+    The file is memory-mapped and every bound pair is extracted by a single
+    findall call with a precompiled bytes pattern, with no split() layers.
+    """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [(int(start), int(end)) for start, end in _RANGE_RE.findall(mm)]
+
+
+def _numbered(ids):
+    """Format IDs as '[1] a, [2] b, ...' for debug output."""
+    return ", ".join(map("[{}] {}".format, range(1, len(ids) + 1), ids))
 
 
 def solve_gift_shop(filename, verbose=False, debug=False, repeating_pattern=False):
@@ -44,49 +248,102 @@ def solve_gift_shop(filename, verbose=False, debug=False, repeating_pattern=Fals
     Returns:
         Sum of all invalid IDs
     """
-    with open(filename) as f:
-        line = f.read().strip()
-    
-    ranges = line.split(',')
+    ranges = read_ranges(filename)
     total = 0
-    invalid_ids = []
+    count = 0
     
-    for range_str in ranges:
-        start, end = map(int, range_str.split('-'))
-        
-        for num in range(start, end + 1):
-            if is_invalid_id(num, repeating_pattern=repeating_pattern):
-                total += num
-                invalid_ids.append(num)
+    # Only keep the IDs themselves when they are going to be listed
+    invalid_ids = [] if debug else None
+    
+    # Generate only the invalid IDs inside each range, never scanning the gaps
+    for start, end in ranges:
+        if not debug and _scan_range_nb is not None and end < NUMBA_SCAN_LIMIT:
+            range_total, range_count = _scan_range_nb(max(start, 1), end, repeating_pattern)
+            total += range_total
+            count += range_count
+            continue
+        found = invalid_ids_in_range(start, end, repeating_pattern=repeating_pattern)
+        total += sum(found)
+        count += len(found)
+        if debug:
+            invalid_ids.extend(found)
     
     if verbose:
-        print(f"Found {len(invalid_ids)} invalid IDs")
+        print(f"Found {count} invalid IDs")
     
     if debug:
         if repeating_pattern:
-            # Separate into half-half patterns and other repeating patterns
-            half_half = []
-            other_patterns = []
-            
-            for id_num in invalid_ids:
-                s = str(id_num)
-                length = len(s)
-                # Check if it's a half-half pattern
-                if length % 2 == 0:
-                    mid = length // 2
-                    if s[:mid] == s[mid:]:
-                        half_half.append(id_num)
-                        continue
-                other_patterns.append(id_num)
-            
-            print("Half-half patterns: " + ", ".join(f"[{i+1}] {id}" for i, id in enumerate(half_half)))
-            print("Other repeating patterns: " + ", ".join(f"[{i+1}] {id}" for i, id in enumerate(other_patterns)))
+            # Half-half IDs are exactly the Part One invalid IDs
+            half_half = [id_num for id_num in invalid_ids if is_invalid_id(id_num)]
+            other_patterns = [id_num for id_num in invalid_ids if not is_invalid_id(id_num)]
+            print("Half-half patterns: " + _numbered(half_half))
+            print("Other repeating patterns: " + _numbered(other_patterns))
         else:
-            print(", ".join(f"[{i+1}] {id}" for i, id in enumerate(invalid_ids)))
+            print(_numbered(invalid_ids))
+    
+    return total
+
+
+def _sum_invalid_in_range(id_range, repeating_pattern=False):
+    """
+    Sum the invalid IDs in one inclusive (start, end) range with NumPy.
+    
+    The range is split at powers of ten so every sub-range has a constant
+    digit count, then all repetition tests for that length run as whole-array
+    comparisons over NUMPY_CHUNK IDs at a time instead of one is_invalid_id
+    call per ID.
+    """
+    start, end = id_range
+    total = 0
+    
+    while start <= end:
+        length = digit_count(start)
+        sub_end = min(end, pow10(length) - 1)
+        reps = band_repunits(length, repeating_pattern)
+        
+        # Bands past 18 digits do not fit an int64 array; enumerate them exactly instead
+        if length > 18:
+            total += sum(invalid_ids_in_range(start, sub_end, repeating_pattern))
+        # Work through the band in fixed-size chunks so the arrays stay cache-sized
+        elif reps:
+            for chunk_start in range(start, sub_end + 1, NUMPY_CHUNK):
+                chunk_end = min(chunk_start + NUMPY_CHUNK, sub_end + 1)
+                ids = np.arange(chunk_start, chunk_end, dtype=np.int64)
+                mask = ids % reps[0] == 0
+                for rep in reps[1:]:
+                    mask |= ids % rep == 0
+                total += int(ids[mask].sum())
+        
+        start = sub_end + 1
     
     return total
 
 
+def solve_gift_shop_vec(filename, repeating_pattern=False):
+    """
+    Vectorised variant of solve_gift_shop using NumPy.
+    
+    Ranges are independent, so when the input covers enough IDs to outweigh
+    process start-up they are spread across a process pool.
+    
+    Args:
+        filename: Path to file containing comma-separated ranges
+        repeating_pattern: If True, use Part Two rules (pattern repeated at least twice)
+    
+    Returns:
+        Sum of all invalid IDs
+    """
+    ranges = read_ranges(filename)
+    worker = partial(_sum_invalid_in_range, repeating_pattern=repeating_pattern)
+    
+    total_ids = sum(end - start + 1 for start, end in ranges)
+    if len(ranges) > 1 and total_ids > PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor() as executor:
+            return sum(executor.map(worker, ranges))
+    
+    return sum(map(worker, ranges))
+
+
 if __name__ == '__main__':
     import sys
     import argparse
@@ -97,9 +354,14 @@ if __name__ == '__main__':
     parser.add_argument('-d', '--debug', action='store_true', help='List all invalid IDs')
     parser.add_argument('--repeating-pattern', action='store_true', 
                        help='Use Part Two rules: pattern repeated at least twice')
+    parser.add_argument('--numpy', action='store_true',
+                       help='Use the vectorised NumPy solver')
     
     args = parser.parse_args()
     
-    result = solve_gift_shop(args.input_file, verbose=args.verbose, debug=args.debug,
-                            repeating_pattern=args.repeating_pattern)
+    if args.numpy:
+        result = solve_gift_shop_vec(args.input_file, repeating_pattern=args.repeating_pattern)
+    else:
+        result = solve_gift_shop(args.input_file, verbose=args.verbose, debug=args.debug,
+                                repeating_pattern=args.repeating_pattern)
     print(f"Sum of invalid IDs: {result}")
@@ -1,7 +1,37 @@
 import unittest
-from gift_shop import is_invalid_id, solve_gift_shop
+from gift_shop import (_scan_range_kernel, band_repunits, digit_count, invalid_ids_in_range,
+                       is_invalid_id, solve_gift_shop, solve_gift_shop_vec)
 import tempfile
 import os
+from unittest import mock
+
+
+class TestDigitCount(unittest.TestCase):
+    """Test the arithmetic digit counter used by is_invalid_id."""
+    
+    def test_matches_string_length(self):
+        """Test that digit counts match len(str(n)) around every power of ten."""
+        for power in range(1, 20):
+            for num in (10 ** power - 1, 10 ** power, 10 ** power + 1):
+                with self.subTest(num=num):
+                    self.assertEqual(digit_count(num), len(str(num)))
+    
+    def test_zero_has_one_digit(self):
+        """Test that zero is treated as a single digit."""
+        self.assertEqual(digit_count(0), 1)
+
+
+class TestBandRepunits(unittest.TestCase):
+    """Test the per-digit-count repunit tables."""
+    
+    def test_part_one_uses_half_length_only(self):
+        """Test Part One has one repunit for even lengths and none for odd."""
+        self.assertEqual(band_repunits(6), (1001,))
+        self.assertEqual(band_repunits(5), ())
+    
+    def test_part_two_uses_every_proper_divisor(self):
+        """Test Part Two covers pattern lengths 1, 2 and 3 for six digits."""
+        self.assertEqual(band_repunits(6, repeating_pattern=True), (111111, 10101, 1001))
 
 
 class TestIsInvalidId(unittest.TestCase):
@@ -10,58 +40,58 @@ class TestIsInvalidId(unittest.TestCase):
     def test_part_one_valid_ids(self):
         """Test that valid IDs are not flagged in Part One."""
         valid_ids = [12, 123, 1234, 101, 1001, 12345]
-        for id_num in valid_ids:
-            with self.subTest(id=id_num):
-                self.assertFalse(is_invalid_id(id_num, repeating_pattern=False))
+        results = [is_invalid_id(id_num, repeating_pattern=False) for id_num in valid_ids]
+        self.assertEqual(results, [False] * len(valid_ids),
+                         msg=f"Failures: {[i for i, r in zip(valid_ids, results) if r is not False]}")
     
     def test_part_one_invalid_ids_two_digit(self):
         """Test two-digit repeating patterns."""
         invalid_ids = [11, 22, 33, 44, 55, 66, 77, 88, 99]
-        for id_num in invalid_ids:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=False))
+        results = [is_invalid_id(id_num, repeating_pattern=False) for id_num in invalid_ids]
+        self.assertEqual(results, [True] * len(invalid_ids),
+                         msg=f"Failures: {[i for i, r in zip(invalid_ids, results) if r is not True]}")
     
     def test_part_one_invalid_ids_four_digit(self):
         """Test four-digit repeating patterns."""
         invalid_ids = [1010, 6464, 1212, 9999]
-        for id_num in invalid_ids:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=False))
+        results = [is_invalid_id(id_num, repeating_pattern=False) for id_num in invalid_ids]
+        self.assertEqual(results, [True] * len(invalid_ids),
+                         msg=f"Failures: {[i for i, r in zip(invalid_ids, results) if r is not True]}")
     
     def test_part_one_invalid_ids_six_digit(self):
         """Test six-digit repeating patterns."""
         invalid_ids = [123123, 456456, 999999]
-        for id_num in invalid_ids:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=False))
+        results = [is_invalid_id(id_num, repeating_pattern=False) for id_num in invalid_ids]
+        self.assertEqual(results, [True] * len(invalid_ids),
+                         msg=f"Failures: {[i for i, r in zip(invalid_ids, results) if r is not True]}")
     
     def test_part_one_invalid_ids_from_spec(self):
         """Test specific examples from the problem specification."""
         spec_examples = [11, 22, 99, 1010, 1188511885, 222222, 446446, 38593859]
-        for id_num in spec_examples:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=False))
+        results = [is_invalid_id(id_num, repeating_pattern=False) for id_num in spec_examples]
+        self.assertEqual(results, [True] * len(spec_examples),
+                         msg=f"Failures: {[i for i, r in zip(spec_examples, results) if r is not True]}")
     
     def test_part_one_odd_length_always_valid(self):
         """Test that odd-length numbers are always valid in Part One."""
         odd_length_ids = [111, 123, 12345, 999, 1234567]
-        for id_num in odd_length_ids:
-            with self.subTest(id=id_num):
-                self.assertFalse(is_invalid_id(id_num, repeating_pattern=False))
+        results = [is_invalid_id(id_num, repeating_pattern=False) for id_num in odd_length_ids]
+        self.assertEqual(results, [False] * len(odd_length_ids),
+                         msg=f"Failures: {[i for i, r in zip(odd_length_ids, results) if r is not False]}")
     
     def test_part_two_triple_repeats(self):
         """Test patterns repeated three times."""
         triple_repeats = [111, 222, 333, 999, 123123123]
-        for id_num in triple_repeats:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=True))
+        results = [is_invalid_id(id_num, repeating_pattern=True) for id_num in triple_repeats]
+        self.assertEqual(results, [True] * len(triple_repeats),
+                         msg=f"Failures: {[i for i, r in zip(triple_repeats, results) if r is not True]}")
     
     def test_part_two_five_repeats(self):
         """Test patterns repeated five times."""
         five_repeats = [11111, 55555, 1212121212]
-        for id_num in five_repeats:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=True))
+        results = [is_invalid_id(id_num, repeating_pattern=True) for id_num in five_repeats]
+        self.assertEqual(results, [True] * len(five_repeats),
+                         msg=f"Failures: {[i for i, r in zip(five_repeats, results) if r is not True]}")
     
     def test_part_two_seven_repeats(self):
         """Test patterns repeated seven times."""
@@ -71,9 +101,9 @@ class TestIsInvalidId(unittest.TestCase):
     def test_part_two_includes_part_one_patterns(self):
         """Test that Part Two rules include all Part One patterns."""
         part_one_patterns = [11, 22, 6464, 123123, 1010, 446446]
-        for id_num in part_one_patterns:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=True))
+        results = [is_invalid_id(id_num, repeating_pattern=True) for id_num in part_one_patterns]
+        self.assertEqual(results, [True] * len(part_one_patterns),
+                         msg=f"Failures: {[i for i, r in zip(part_one_patterns, results) if r is not True]}")
     
     def test_part_two_from_spec(self):
         """Test specific examples from Part Two specification."""
@@ -81,16 +111,16 @@ class TestIsInvalidId(unittest.TestCase):
             111, 999, 565656, 824824824, 2121212121,
             12341234, 123123123, 1212121212, 1111111
         ]
-        for id_num in spec_examples:
-            with self.subTest(id=id_num):
-                self.assertTrue(is_invalid_id(id_num, repeating_pattern=True))
+        results = [is_invalid_id(id_num, repeating_pattern=True) for id_num in spec_examples]
+        self.assertEqual(results, [True] * len(spec_examples),
+                         msg=f"Failures: {[i for i, r in zip(spec_examples, results) if r is not True]}")
     
     def test_part_two_valid_ids(self):
         """Test that non-repeating patterns are valid in Part Two."""
         valid_ids = [12, 123, 1234, 12345, 123456, 1234567]
-        for id_num in valid_ids:
-            with self.subTest(id=id_num):
-                self.assertFalse(is_invalid_id(id_num, repeating_pattern=True))
+        results = [is_invalid_id(id_num, repeating_pattern=True) for id_num in valid_ids]
+        self.assertEqual(results, [False] * len(valid_ids),
+                         msg=f"Failures: {[i for i, r in zip(valid_ids, results) if r is not False]}")
     
     def test_edge_case_single_digit(self):
         """Test single-digit numbers (should be valid)."""
@@ -100,8 +130,62 @@ class TestIsInvalidId(unittest.TestCase):
                 self.assertFalse(is_invalid_id(i, repeating_pattern=True))
 
 
-class TestSolveGiftShop(unittest.TestCase):
-    """Test the solve_gift_shop function with example data."""
+class TestInvalidIdsInRange(unittest.TestCase):
+    """Test direct enumeration of invalid IDs."""
+    
+    def test_matches_per_id_check(self):
+        """Test that enumeration agrees with is_invalid_id for every ID up to a limit."""
+        for repeating in (False, True):
+            with self.subTest(repeating_pattern=repeating):
+                expected = [n for n in range(20000) if is_invalid_id(n, repeating_pattern=repeating)]
+                self.assertEqual(invalid_ids_in_range(1, 19999, repeating_pattern=repeating), expected)
+    
+    def test_no_duplicates_in_part_two(self):
+        """Test that IDs matching several periods (e.g. 111111) appear once."""
+        ids = invalid_ids_in_range(1, 111111, repeating_pattern=True)
+        self.assertEqual(ids.count(111111), 1)
+    
+    def test_range_crossing_digit_bands(self):
+        """Test a range spanning several digit counts only yields IDs inside it."""
+        for repeating in (False, True):
+            with self.subTest(repeating_pattern=repeating):
+                expected = [n for n in range(95, 12346) if is_invalid_id(n, repeating_pattern=repeating)]
+                self.assertEqual(invalid_ids_in_range(95, 12345, repeating_pattern=repeating), expected)
+    
+    def test_ids_beyond_power_table(self):
+        """Test 21- and 22-digit IDs, past the end of POW10, in both modes."""
+        half = 12345678901 * (10 ** 11 + 1)  # 11-digit head twice
+        ones = (10 ** 21 - 1) // 9  # 21 ones
+        cases = [
+            (half - 3, half + 3, [half], [half]),
+            (ones - 3, ones + 3, [], [ones]),
+            (10 ** 20 - 5, 10 ** 20 + 5, [10 ** 20 - 1], [10 ** 20 - 1]),
+        ]
+        for start, end, part_one, part_two in cases:
+            with self.subTest(start=start, end=end):
+                self.assertEqual(invalid_ids_in_range(start, end, repeating_pattern=False), part_one)
+                self.assertEqual(invalid_ids_in_range(start, end, repeating_pattern=True), part_two)
+        self.assertTrue(is_invalid_id(half, repeating_pattern=False))
+        self.assertTrue(is_invalid_id(ones, repeating_pattern=True))
+        self.assertFalse(is_invalid_id(10 ** 20 + 5, repeating_pattern=True))
+        self.assertFalse(is_invalid_id(ones, repeating_pattern=False))
+
+
+class TestScanRangeKernel(unittest.TestCase):
+    """Test the compilable range scan counts each invalid ID once."""
+    
+    def test_matches_generated_ids(self):
+        """Test sum and count agree with invalid_ids_in_range across digit bands."""
+        for start, end in [(1, 100_000), (95, 1012), (999_990, 1_000_010), (222_220, 222_224)]:
+            for repeating_pattern in (False, True):
+                with self.subTest(start=start, end=end, repeating_pattern=repeating_pattern):
+                    found = invalid_ids_in_range(start, end, repeating_pattern)
+                    self.assertEqual(_scan_range_kernel(start, end, repeating_pattern),
+                                     (sum(found), len(found)))
+
+
+class TempFileMixin:
+    """Per-test temporary directory for range files."""
     
     def setUp(self):
         """Create temporary test files."""
@@ -119,6 +203,10 @@ class TestSolveGiftShop(unittest.TestCase):
         with os.fdopen(fd, 'w') as f:
             f.write(content)
         return path
+
+
+class TestSolveGiftShop(TempFileMixin, unittest.TestCase):
+    """Test the solve_gift_shop function with example data."""
     
     def test_part_one_example(self):
         """Test Part One with the example from the specification."""
@@ -165,6 +253,58 @@ class TestSolveGiftShop(unittest.TestCase):
         test_file = self.create_test_file("11-11")
         result = solve_gift_shop(test_file, repeating_pattern=False)
         self.assertEqual(result, 11)
+    
+    def test_trailing_newline(self):
+        """Test that surrounding whitespace in the input is ignored."""
+        test_file = self.create_test_file("11-22,\n95-115\n")
+        result = solve_gift_shop(test_file, repeating_pattern=False)
+        self.assertEqual(result, 11 + 22 + 99)
+    
+    def test_without_numba_scan(self):
+        """Test the set-based fallback gives the same sums as the compiled scan."""
+        test_file = self.create_test_file("11-22,95-115,998-1012,1188511880-1188511890,2121212118-2121212124")
+        for repeating_pattern in (False, True):
+            with self.subTest(repeating_pattern=repeating_pattern):
+                expected = solve_gift_shop(test_file, repeating_pattern=repeating_pattern)
+                with mock.patch('gift_shop._scan_range_nb', None):
+                    result = solve_gift_shop(test_file, repeating_pattern=repeating_pattern)
+                self.assertEqual(result, expected)
+
+
+class TestSolveGiftShopVec(TempFileMixin, unittest.TestCase):
+    """Test the NumPy solver agrees with the scalar solver."""
+    
+    def test_examples_match_expected(self):
+        """Test both parts of the specification example."""
+        example_input = "11-22,95-115,998-1012,1188511880-1188511890,222220-222224,1698522-1698528,446443-446449,38593856-38593862,565653-565659,824824821-824824827,2121212118-2121212124"
+        test_file = self.create_test_file(example_input)
+        
+        self.assertEqual(solve_gift_shop_vec(test_file, repeating_pattern=False), 1227775554)
+        self.assertEqual(solve_gift_shop_vec(test_file, repeating_pattern=True), 4174379265)
+    
+    def test_range_crossing_digit_counts(self):
+        """Test a range spanning several digit lengths is split correctly."""
+        test_file = self.create_test_file("5-12345")
+        for repeating in (False, True):
+            with self.subTest(repeating_pattern=repeating):
+                self.assertEqual(solve_gift_shop_vec(test_file, repeating_pattern=repeating),
+                                 solve_gift_shop(test_file, repeating_pattern=repeating))
+    
+    def test_ranges_beyond_power_table(self):
+        """Test ranges reaching 20 and 22 digits in both modes, through both solvers."""
+        half = 12345678901 * (10 ** 11 + 1)
+        test_file = self.create_test_file(f"{10 ** 20 - 5}-{10 ** 20 + 5},{half - 3}-{half + 3}")
+        for repeating in (False, True):
+            with self.subTest(repeating_pattern=repeating):
+                self.assertEqual(solve_gift_shop(test_file, repeating_pattern=repeating), 10 ** 20 - 1 + half)
+                self.assertEqual(solve_gift_shop_vec(test_file, repeating_pattern=repeating), 10 ** 20 - 1 + half)
+    
+    def test_process_pool_matches_serial(self):
+        """Test that spreading ranges over a process pool gives the same sum."""
+        test_file = self.create_test_file("11-22,95-115,998-1012,222220-222224")
+        expected = solve_gift_shop(test_file, repeating_pattern=True)
+        with mock.patch('gift_shop.PARALLEL_THRESHOLD', 0):
+            self.assertEqual(solve_gift_shop_vec(test_file, repeating_pattern=True), expected)
 
 
 class TestPatternRecognition(unittest.TestCase):
@@ -3,14 +3,28 @@
 
 import unittest
 import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import theater
 from theater import (
     parse_tiles,
+    parse_tiles_soa,
     find_largest_rectangle,
+    pareto_corners,
     part1,
     part2,
     build_polygon_boundary,
     build_valid_tiles,
+    find_largest_valid_rectangle,
+    find_largest_valid_rectangle_lazy,
+    find_interior_point,
+    flood_fill_interior,
+    is_rectangle_valid,
+    pack_bits,
     point_in_polygon,
+    polygon_centroid,
 )
 
 # Get the directory containing this test file
@@ -41,13 +55,54 @@ class TestParseTiles(unittest.TestCase):
         expected = {(7, 1), (11, 1), (11, 7), (9, 7), (9, 5), (2, 5), (2, 3), (7, 3)}
         self.assertEqual(set(tiles), expected)
 
+    def test_soa_columns_match_tuples(self):
+        """Test that the column form holds the same coordinates in the same order."""
+        xs, ys = parse_tiles_soa(os.path.join(TEST_DIR, 'example.txt'))
+        tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+        self.assertEqual(list(zip(xs.tolist(), ys.tolist())), list(tiles))
+
+    def test_soa_columns_are_shared_read_only_views(self):
+        """Test that repeated parses return read-only views of one cached int64 array."""
+        path = os.path.join(TEST_DIR, 'example.txt')
+        xs, ys = parse_tiles_soa(path)
+        xs_again, _ = parse_tiles_soa(path)
+        self.assertEqual(xs.dtype, np.int64)
+        self.assertIs(xs.base, ys.base)
+        self.assertIs(xs_again.base, xs.base)
+        self.assertFalse(xs.flags.writeable)
+
+    def test_empty_and_comment_only_files(self):
+        """Test that files without coordinates parse to no tiles."""
+        for content in ("", "\n\n", "# header\n  # indented\n"):
+            with self.subTest(content=content):
+                path = self.write_tiles(content)
+                self.assertEqual(list(parse_tiles(path)), [])
+
+    def test_indented_comment_skipped(self):
+        """Test that comment lines with leading whitespace are ignored."""
+        path = self.write_tiles("  # note\n1,2\n\n\t# other\n3,4\n")
+        self.assertEqual(list(parse_tiles(path)), [(1, 2), (3, 4)])
+
+    def write_tiles(self, content):
+        """Write content to a temporary tile file removed after the test."""
+        fd, path = tempfile.mkstemp(suffix='.txt', text=True)
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
 
 class TestFindLargestRectangle(unittest.TestCase):
     """Test rectangle area calculation."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Parse the example input once for the whole class."""
+        cls.example_tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+    
     def test_example_largest_rectangle(self):
         """Test that example input produces area of 50."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+        tiles = self.example_tiles
         area = find_largest_rectangle(tiles)
         self.assertEqual(area, 50)
     
@@ -93,6 +148,12 @@ class TestFindLargestRectangle(unittest.TestCase):
         # Width: |5-(-5)|+1 = 11, Height: |5-(-5)|+1 = 11, Area: 121
         self.assertEqual(area, 121)
     
+    def test_parallel_path_matches_serial(self):
+        """Test the parallel/blocked pair scoring gives the same area."""
+        serial = find_largest_rectangle(self.example_tiles)
+        with mock.patch('theater.PARALLEL_PAIRS', 0):
+            self.assertEqual(find_largest_rectangle(self.example_tiles), serial)
+    
     def test_order_independence(self):
         """Test that tile order doesn't affect result."""
         tiles1 = [(0, 0), (5, 5)]
@@ -108,9 +169,21 @@ class TestFindLargestRectangle(unittest.TestCase):
         # Width: 2, Height: 1, Area: 2
         self.assertEqual(area, 2)
     
+    def test_accepts_column_arrays(self):
+        """Test that (xs, ys) column arrays give the same answer as tuples."""
+        columns = parse_tiles_soa(os.path.join(TEST_DIR, 'example.txt'))
+        self.assertEqual(find_largest_rectangle(columns), 50)
+    
+    def test_bounding_box_not_reachable(self):
+        """Test that corners must be real tiles, not the global bounding box."""
+        tiles = [(0, 0), (10, 1), (1, 10)]
+        area = find_largest_rectangle(tiles)
+        # Bounding box is 11×11, but the best real pair is (10,1)-(1,10): 10×10
+        self.assertEqual(area, 100)
+    
     def test_example_specific_rectangles(self):
         """Test specific rectangle examples from problem description."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+        tiles = self.example_tiles
         
         # Rectangle between (2,5) and (9,7): width=8, height=3, area=24
         # But we're looking for max, which is 50
@@ -126,18 +199,37 @@ class TestFindLargestRectangle(unittest.TestCase):
         self.assertEqual(expected_area, 50)
 
 
+class TestParetoCorners(unittest.TestCase):
+    """Test the lower-left staircase used to prune rectangle corners."""
+    
+    def test_dominated_tiles_removed(self):
+        """Test that tiles above and right of another tile are dropped."""
+        tiles = [(0, 5), (2, 2), (3, 3), (5, 0), (6, 6)]
+        self.assertEqual(pareto_corners(tiles), [(0, 5), (2, 2), (5, 0)])
+    
+    def test_ties_keep_single_corner(self):
+        """Test that tiles sharing an axis keep only the lowest-left one."""
+        tiles = [(1, 4), (1, 2), (3, 2)]
+        self.assertEqual(pareto_corners(tiles), [(1, 2)])
+
+
 class TestPart1(unittest.TestCase):
     """Test part 1 solution."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Parse the example input once for the whole class."""
+        cls.example_tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+    
     def test_part1_with_example(self):
         """Test part 1 with example input."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+        tiles = self.example_tiles
         result = part1(tiles)
         self.assertEqual(result, 50)
     
     def test_part1_returns_integer(self):
         """Test that part 1 returns an integer."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+        tiles = self.example_tiles
         result = part1(tiles)
         self.assertIsInstance(result, int)
 
@@ -210,6 +302,15 @@ class TestPolygonBoundary(unittest.TestCase):
         # Total unique: 4 + 3 + 3 + 2 = 12
         self.assertEqual(len(boundary), 12)
 
+    def test_grid_matches_set_fallback(self):
+        """Test the bool-grid boundary holds the same tiles as the set fallback."""
+        tiles = parse_tiles(os.path.join(TEST_DIR, 'example.txt'))
+        grid = build_polygon_boundary(tiles)
+        with mock.patch('theater.BOUNDARY_GRID_CELLS', 0):
+            fallback = build_polygon_boundary(tiles)
+        self.assertIsInstance(fallback, set)
+        self.assertEqual(set(grid), fallback)
+
 
 class TestPointInPolygon(unittest.TestCase):
     """Test point-in-polygon algorithm."""
@@ -241,20 +342,74 @@ class TestPointInPolygon(unittest.TestCase):
         polygon = [(0, 0), (4, 0), (2, 3)]
         self.assertFalse(point_in_polygon(0, 5, polygon))
 
+    def test_scalar_kernel_matches_vectorised_cast(self):
+        """Test the scalar kernel and PolygonEdges.contains agree, including points on slanted edges."""
+        polygon = [(0, 0), (9, 3), (12, 12), (4, 9), (-3, 6)]
+        poly_x, poly_y = theater.polygon_arrays(polygon)
+        xs, ys = np.meshgrid(np.arange(-4, 14), np.arange(-1, 14))
+        xs, ys = xs.ravel(), ys.ravel()
+        expected = theater.PolygonEdges(polygon).contains(xs, ys).tolist()
+        actual = [theater._point_in_polygon_kernel(x, y, poly_x, poly_y) for x, y in zip(xs, ys)]
+        self.assertEqual(actual, expected)
+
+
+class TestFindInteriorPoint(unittest.TestCase):
+    """Test the interior seed point and the shoelace centroid behind it."""
+
+    def test_square_centroid(self):
+        """Test the centroid of a square is its centre."""
+        self.assertEqual(polygon_centroid([(0, 0), (4, 0), (4, 4), (0, 4)]), (2.0, 2.0))
+
+    def test_degenerate_polygon_has_no_centroid(self):
+        """Test a zero-area polygon has no centroid."""
+        self.assertIsNone(polygon_centroid([(0, 0), (5, 0)]))
+
+    def test_concave_polygon_point_is_inside(self):
+        """Test an L-shape, whose centroid lies outside, still yields an interior point."""
+        tiles = [(0, 0), (10, 0), (10, 2), (2, 2), (2, 10), (0, 10)]
+        boundary = build_polygon_boundary(tiles)
+        x, y = find_interior_point(tiles, boundary)
+        self.assertNotIn((x, y), boundary)
+        self.assertTrue(point_in_polygon(x, y, tiles))
+
+
+class TestFloodFillInterior(unittest.TestCase):
+    """Test flood filling inside a closed boundary."""
+
+    def test_square_interior(self):
+        """Test that the fill stays inside the square's boundary."""
+        tiles = [(0, 0), (3, 0), (3, 3), (0, 3)]
+        boundary = build_polygon_boundary(tiles)
+        interior = flood_fill_interior((1, 1), boundary, tiles)
+        self.assertEqual(interior, {(1, 1), (1, 2), (2, 1), (2, 2)})
+
+    def test_triangle_interior(self):
+        """Test a slanted edge, which the rasterised boundary leaves open, still stops the fill."""
+        tiles = [(0, 0), (10, 0), (0, 10)]
+        boundary = build_polygon_boundary(tiles)
+        interior = flood_fill_interior((2, 2), boundary, tiles)
+        expected = {(x, y) for x in range(1, 10) for y in range(1, 10) if x + y < 10}
+        self.assertEqual(interior, expected)
+
 
 class TestBuildValidTiles(unittest.TestCase):
     """Test valid tile set construction."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Parse the example input once for the whole class."""
+        cls.example_tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+
     def test_example_valid_tiles_count(self):
         """Test that example produces correct number of valid tiles."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+        tiles = self.example_tiles
         valid_tiles = build_valid_tiles(tiles)
         # Should have 8 red + 22 green boundary + 16 interior = 46
         self.assertEqual(len(valid_tiles), 46)
 
     def test_valid_tiles_include_red(self):
         """Test that valid tiles include all red tiles."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+        tiles = self.example_tiles
         valid_tiles = build_valid_tiles(tiles)
         for tile in tiles:
             self.assertIn(tile, valid_tiles)
@@ -266,25 +421,158 @@ class TestBuildValidTiles(unittest.TestCase):
         # Should include boundary (12) + interior (2×2=4) = 16
         self.assertEqual(len(valid_tiles), 16)
 
+    def test_tiles_outside_bounding_box_invalid(self):
+        """Test that tiles beyond the grid's bounding box are not valid."""
+        tiles = [(0, 0), (3, 0), (3, 3), (0, 3)]
+        valid_tiles = build_valid_tiles(tiles)
+        self.assertNotIn((-1, 0), valid_tiles)
+        self.assertNotIn((4, 4), valid_tiles)
+
+    def test_concave_polygon_valid_tiles(self):
+        """Test that the notch of an L-shaped polygon is excluded."""
+        tiles = [(0, 0), (4, 0), (4, 2), (2, 2), (2, 4), (0, 4)]
+        valid_tiles = build_valid_tiles(tiles)
+        # 5×5 bounding box minus the 2×2 notch at x=3..4, y=3..4
+        self.assertEqual(len(valid_tiles), 21)
+        self.assertNotIn((3, 3), valid_tiles)
+
+    def test_blocked_ray_cast_matches_flood_fill(self):
+        """Test the ray-cast fallback, split into small blocks, builds the same grid."""
+        for tiles in (self.example_tiles, [(0, 0), (4, 0), (4, 2), (2, 2), (2, 4), (0, 4)]):
+            with self.subTest(tiles=tiles):
+                expected = set(build_valid_tiles(tiles))
+                with mock.patch('theater._fill_exterior_nb', None), \
+                        mock.patch('theater.PARALLEL_PAIRS', 7):
+                    self.assertEqual(set(build_valid_tiles(tiles)), expected)
+
+    def test_triangle_valid_tiles(self):
+        """Test a polygon with a slanted edge goes through the ray cast."""
+        valid_tiles = build_valid_tiles([(0, 0), (10, 0), (0, 10)])
+        self.assertIn((2, 2), valid_tiles)
+        self.assertNotIn((9, 9), valid_tiles)
+
+    def test_oversized_bounding_box_refused(self):
+        """Test the dense grid is not built past BOUNDARY_GRID_CELLS."""
+        with mock.patch('theater.BOUNDARY_GRID_CELLS', 15):
+            with self.assertRaises(ValueError):
+                build_valid_tiles([(0, 0), (3, 0), (3, 3), (0, 3)])
+
+
+class TestFillExterior(unittest.TestCase):
+    """Test the exterior flood kernel in both its compiled and pure-Python forms."""
+
+    def test_fill_stops_at_walls_and_grows_stack(self):
+        """Test an open 40x40 field, which outgrows the initial stack, is filled around a walled box."""
+        kernels = [theater._fill_exterior_kernel]
+        if theater._fill_exterior_nb is not None:
+            kernels.append(theater._fill_exterior_nb)
+        for kernel in kernels:
+            with self.subTest(kernel=kernel):
+                grid = np.zeros((40, 40), dtype=np.uint8)
+                grid[10:20, 10] = grid[10:20, 19] = 1
+                grid[10, 10:20] = grid[19, 10:20] = 1
+                kernel(grid)
+                self.assertTrue((grid[11:19, 11:19] == 0).all())
+                self.assertEqual(int((grid == 2).sum()), 40 * 40 - 100)
+
+
+class TestIsRectangleValid(unittest.TestCase):
+    """Test rectangle validation against the valid tile grid."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the grid for an L-shaped polygon once."""
+        cls.valid_tiles = build_valid_tiles([(0, 0), (4, 0), (4, 2), (2, 2), (2, 4), (0, 4)])
+
+    def test_rectangle_inside_polygon(self):
+        """Test rectangles fully inside the L are valid."""
+        self.assertTrue(is_rectangle_valid(0, 0, 4, 2, self.valid_tiles))
+        self.assertTrue(is_rectangle_valid(2, 4, 0, 0, self.valid_tiles))
+
+    def test_rectangle_covering_notch(self):
+        """Test a rectangle covering the notch is rejected."""
+        self.assertFalse(is_rectangle_valid(0, 0, 4, 4, self.valid_tiles))
+
+    def test_grid_matches_set(self):
+        """Test the grid fast path agrees with a plain set of tiles."""
+        tile_set = set(self.valid_tiles)
+        for x2 in range(5):
+            for y2 in range(5):
+                with self.subTest(corner=(x2, y2)):
+                    self.assertEqual(is_rectangle_valid(0, 0, x2, y2, self.valid_tiles),
+                                     is_rectangle_valid(0, 0, x2, y2, tile_set))
+
+
+class FakeKernels:
+    """Stand-in for the compiled theater_kernels module that records each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def point_in_polygon(self, x, y, poly_x, poly_y):
+        self.calls.append('point_in_polygon')
+        return theater._point_in_polygon_kernel(x, y, poly_x, poly_y)
+
+    def rectangle_all_set(self, mask, i1, i2, j1, j2):
+        self.calls.append(('rectangle_all_set', mask.dtype))
+        return bool(mask[i1:i2 + 1, j1:j2 + 1].all())
+
+
+class TestCythonDispatch(unittest.TestCase):
+    """Test the compiled kernels are used when Numba is missing."""
+
+    def test_kernels_used_without_numba(self):
+        """Test point and rectangle checks go through theater_kernels with the expected arguments."""
+        kernels = FakeKernels()
+        valid_tiles = build_valid_tiles([(0, 0), (4, 0), (4, 2), (2, 2), (2, 4), (0, 4)])
+        with mock.patch('theater.theater_kernels', kernels), \
+                mock.patch('theater._point_in_polygon_nb', None), \
+                mock.patch('theater._rectangle_all_set_nb', None):
+            self.assertTrue(point_in_polygon(2, 2, [(0, 0), (4, 0), (4, 4), (0, 4)]))
+            self.assertFalse(point_in_polygon(5, 5, [(0, 0), (4, 0), (4, 4), (0, 4)]))
+            self.assertTrue(is_rectangle_valid(0, 0, 4, 2, valid_tiles))
+            self.assertFalse(is_rectangle_valid(0, 0, 4, 4, valid_tiles))
+        self.assertEqual(kernels.calls, ['point_in_polygon'] * 2 + [('rectangle_all_set', np.uint8)] * 2)
+
+
+class TestPackBits(unittest.TestCase):
+    """Test packing mask rows into 64-bit words."""
+
+    def test_bits_follow_columns(self):
+        """Test that bit k of word w holds column 64*w + k."""
+        mask = np.zeros((2, 70), dtype=bool)
+        mask[0, [0, 63, 64, 69]] = True
+        mask[1, :] = True
+        packed = pack_bits(mask)
+        self.assertEqual(packed.shape, (2, 2))
+        self.assertEqual(int(packed[0, 0]), (1 << 63) | 1)
+        self.assertEqual(int(packed[0, 1]), (1 << 5) | 1)
+        self.assertEqual(int(packed[1, 1]), (1 << 6) - 1)
+
 
 class TestPart2(unittest.TestCase):
     """Test part 2 solution."""
 
+    @classmethod
+    def setUpClass(cls):
+        """Parse the example input once for the whole class."""
+        cls.example_tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+
     def test_part2_with_example(self):
         """Test part 2 with example input."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+        tiles = self.example_tiles
         result = part2(tiles)
         self.assertEqual(result, 24)
 
     def test_part2_returns_integer(self):
         """Test that part 2 returns an integer."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+        tiles = self.example_tiles
         result = part2(tiles)
         self.assertIsInstance(result, int)
 
     def test_part2_less_than_or_equal_part1(self):
         """Test that part 2 result is <= part 1 (more constraints)."""
-        tiles = parse_tiles(os.path.join(TEST_DIR, "example.txt"))
+        tiles = self.example_tiles
         result1 = part1(tiles)
         result2 = part2(tiles)
         self.assertLessEqual(result2, result1)
@@ -296,6 +584,13 @@ class TestPart2(unittest.TestCase):
         # Entire 4×4 area should be valid
         self.assertEqual(result, 16)
 
+    def test_valid_rectangle_search_accepts_columns(self):
+        """Test that both valid-rectangle searches take (xs, ys) columns without rebuilding tuples."""
+        columns = parse_tiles_soa(os.path.join(TEST_DIR, "example.txt"))
+        self.assertEqual(find_largest_valid_rectangle(columns, build_valid_tiles(columns)), 24)
+        self.assertEqual(find_largest_valid_rectangle_lazy(columns, build_polygon_boundary(columns)), 24)
+        self.assertEqual(part2(columns), 24)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,44 +2,239 @@
 """Day 9: Movie Theater Tiles - Find largest rectangle between red tiles."""
 
 import argparse
-from itertools import combinations
+import os
+from collections import deque
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+
+try:
+    from numba import njit, prange, types
+except ImportError:
+    njit = None
+    prange = range
+
+# Optional Cython build of the hot kernels (cythonize -i theater_kernels.pyx), found
+# next to this file whether it is imported as a script module or from a package
+try:
+    from . import theater_kernels
+except ImportError:
+    try:
+        import theater_kernels
+    except ImportError:
+        theater_kernels = None
+
+# Corner-pair counts above this are scored in parallel (Numba) or in blocks (NumPy)
+PARALLEL_PAIRS = 1_000_000
+
+# Boundaries whose bounding box has more tiles than this are kept as a set, not a grid
+BOUNDARY_GRID_CELLS = 50_000_000
+
+
+@lru_cache(maxsize=32)
+def _parse_tiles_cached(path, mtime):
+    """Parse a tile file once per (path, mtime) into a shared read-only (2, N) int64 array."""
+    # Blank and '#' lines (indented or not) are dropped first; loadtxt then
+    # does the integer conversion in C
+    with open(path) as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith('#')]
+    if lines:
+        coords = np.loadtxt(lines, dtype=np.int64, delimiter=',', comments='#', ndmin=2)
+    else:
+        coords = np.empty((0, 2), dtype=np.int64)
+    
+    # Transposed once so each column is a contiguous row the callers get as a view
+    columns = np.ascontiguousarray(coords.T)
+    columns.setflags(write=False)
+    return columns
+
+
+def parse_tiles_soa(filename):
+    """
+    Parse red tile coordinates as two int64 arrays (xs, ys).
+    
+    The arrays are read-only views of one cached array shared between callers.
+    """
+    path = os.path.abspath(filename)
+    columns = _parse_tiles_cached(path, os.path.getmtime(path))
+    return columns[0], columns[1]
 
 
 def parse_tiles(filename):
     """Parse red tile coordinates from input file."""
-    tiles = []
-    with open(filename) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                x, y = map(int, line.split(','))
-                tiles.append((x, y))
-    return tiles
+    xs, ys = parse_tiles_soa(filename)
+    return tuple(zip(xs.tolist(), ys.tolist()))
+
+
+def tile_columns(tiles):
+    """Return int64 (xs, ys) arrays for tiles given as (x, y) pairs or already as columns."""
+    if isinstance(tiles, tuple) and len(tiles) == 2 and isinstance(tiles[0], np.ndarray):
+        return tiles
+    coords = np.array(tiles, dtype=np.int64).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1]
+
+
+def polygon_arrays(polygon_vertices):
+    """Return polygon vertices as int64 NumPy (xs, ys) arrays, converting at most once."""
+    if isinstance(polygon_vertices, PolygonEdges):
+        return polygon_vertices.xs, polygon_vertices.ys
+    xs, ys = tile_columns(polygon_vertices)
+    return np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+
+
+def pareto_corners(tiles):
+    """
+    Return the tiles not dominated towards the lower-left corner.
+    
+    A tile is dropped when another tile has both x and y less than or equal
+    to it, because swapping it for that tile can only grow a rectangle that
+    extends up and to the right. Sorting by (x, y) and keeping each tile whose
+    y beats everything seen so far yields the staircase in O(N log N).
+    """
+    corners = []
+    best_y = None
+    for x, y in sorted(tiles):
+        if best_y is None or y < best_y:
+            corners.append((x, y))
+            best_y = y
+    return corners
+
+
+def _max_pair_area_kernel(xs_a, ys_a, xs_b, ys_b, upper_bound):
+    """
+    Largest (|dx|+1) * (|dy|+1) over every pair with one corner from each list.
+    
+    Written with plain integer loops so Numba can compile it; returns
+    (area, i, j) where i and j index the best corners (-1 if none). Stops
+    as soon as upper_bound is reached, since no pair can beat it.
+    """
+    best = 0
+    best_i = -1
+    best_j = -1
+    for i in range(len(xs_a)):
+        for j in range(len(xs_b)):
+            area = (abs(xs_b[j] - xs_a[i]) + 1) * (abs(ys_b[j] - ys_a[i]) + 1)
+            if area > best:
+                best = area
+                best_i = i
+                best_j = j
+                if best == upper_bound:
+                    return best, best_i, best_j
+    return best, best_i, best_j
+
+
+def _max_pair_area_rows_kernel(xs_a, ys_a, xs_b, ys_b, row_best, row_j):
+    """
+    Per-row variant of _max_pair_area_kernel for parallel compilation.
+    
+    Each corner i of the first list writes its own best area and partner
+    index, so rows can run on separate threads and the caller reduces
+    row_best with a single argmax.
+    """
+    for i in prange(len(xs_a)):
+        best = 0
+        best_j = -1
+        for j in range(len(xs_b)):
+            area = (abs(xs_b[j] - xs_a[i]) + 1) * (abs(ys_b[j] - ys_a[i]) + 1)
+            if area > best:
+                best = area
+                best_j = j
+        row_best[i] = best
+        row_j[i] = best_j
+
+
+if njit is not None:
+    _max_pair_area_nb = njit(
+        'UniTuple(int64, 3)(int64[:], int64[:], int64[:], int64[:], int64)', cache=True
+    )(_max_pair_area_kernel)
+    _max_pair_area_rows_nb = njit(
+        'void(int64[:], int64[:], int64[:], int64[:], int64[:], int64[:])',
+        parallel=True, cache=True
+    )(_max_pair_area_rows_kernel)
+else:
+    _max_pair_area_nb = None
+    _max_pair_area_rows_nb = None
+
+
+def max_pair_area(corners_a, corners_b, upper_bound=-1):
+    """
+    Find the largest rectangle with one corner from each list, returning (area, pair).
+    
+    The search stops early once an area equal to upper_bound is found.
+    """
+    if not corners_a or not corners_b:
+        return 0, None
+    
+    a = np.array(corners_a, dtype=np.int64).reshape(-1, 2)
+    b = np.array(corners_b, dtype=np.int64).reshape(-1, 2)
+    
+    num_pairs = len(a) * len(b)
+    
+    if _max_pair_area_nb is not None and num_pairs < PARALLEL_PAIRS:
+        area, i, j = _max_pair_area_nb(a[:, 0], a[:, 1], b[:, 0], b[:, 1], upper_bound)
+    elif _max_pair_area_nb is not None:
+        # Large lists: score rows across threads, then reduce the per-row maxima
+        row_best = np.empty(len(a), dtype=np.int64)
+        row_j = np.empty(len(a), dtype=np.int64)
+        _max_pair_area_rows_nb(a[:, 0], a[:, 1], b[:, 0], b[:, 1], row_best, row_j)
+        i = int(row_best.argmax())
+        area, j = int(row_best[i]), int(row_j[i])
+    else:
+        # Without Numba, score (a, b) broadcasts a block of rows at a time so
+        # the area matrix never exceeds PARALLEL_PAIRS entries
+        area, i, j = 0, 0, 0
+        rows_per_block = max(1, PARALLEL_PAIRS // len(b))
+        for start in range(0, len(a), rows_per_block):
+            block = a[start:start + rows_per_block]
+            areas = ((np.abs(block[:, 0, None] - b[:, 0]) + 1)
+                     * (np.abs(block[:, 1, None] - b[:, 1]) + 1))
+            bi, bj = np.unravel_index(areas.argmax(), areas.shape)
+            if areas[bi, bj] > area:
+                area, i, j = int(areas[bi, bj]), start + bi, bj
+            if area == upper_bound:
+                break
+    
+    return area, (corners_a[i], corners_b[j])
 
 
 def find_largest_rectangle(tiles, debug=False):
-    """Find the largest rectangle area using any two tiles as opposite corners."""
+    """
+    Find the largest rectangle area using any two tiles as opposite corners.
+    
+    The best rectangle either runs lower-left to upper-right or upper-left to
+    lower-right, and its corners must lie on the matching Pareto staircases,
+    so only staircase pairs are compared rather than all N² pairs.
+    """
+    xs, ys = tile_columns(tiles)
+    if len(xs) < 2:
+        return 0
+    tiles = list(zip(xs.tolist(), ys.tolist()))
+    
+    # Staircases for each corner, found by mirroring the axes
+    lower_left = pareto_corners(tiles)
+    upper_right = [(-x, -y) for x, y in pareto_corners([(-x, -y) for x, y in tiles])]
+    upper_left = [(x, -y) for x, y in pareto_corners([(x, -y) for x, y in tiles])]
+    lower_right = [(-x, y) for x, y in pareto_corners([(-x, y) for x, y in tiles])]
+    
     max_area = 0
     best_pair = None
-    total_pairs = len(tiles) * (len(tiles) - 1) // 2
     
     if debug:
-        print(f"\nChecking {total_pairs} tile pairs...")
-        print(f"Tile coordinate ranges: x=[{min(t[0] for t in tiles)}, {max(t[0] for t in tiles)}], "
-              f"y=[{min(t[1] for t in tiles)}, {max(t[1] for t in tiles)}]")
+        print(f"\nStaircase sizes: lower-left={len(lower_left)}, upper-right={len(upper_right)}, "
+              f"upper-left={len(upper_left)}, lower-right={len(lower_right)}")
+        print(f"Tile coordinate ranges: x=[{min(xs)}, {max(xs)}], y=[{min(ys)}, {max(ys)}]")
     
-    # Check all pairs of tiles
+    # No pair can beat the bounding box of all tiles, so stop once it is reached
     # Area includes both corner tiles, so add 1 to each dimension
-    for i, ((x1, y1), (x2, y2)) in enumerate(combinations(tiles, 2)):
-        width = abs(x2 - x1) + 1
-        height = abs(y2 - y1) + 1
-        area = width * height
-        
+    upper_bound = (max(xs) - min(xs) + 1) * (max(ys) - min(ys) + 1)
+    for corners_a, corners_b in ((lower_left, upper_right), (upper_left, lower_right)):
+        area, pair = max_pair_area(corners_a, corners_b, upper_bound)
         if area > max_area:
             max_area = area
-            best_pair = ((x1, y1), (x2, y2))
-            if debug:
-                print(f"  New max at pair {i+1}: ({x1},{y1}) to ({x2},{y2}) = {width}×{height} = {area}")
+            best_pair = pair
+        if max_area == upper_bound:
+            break
     
     if debug and best_pair:
         (x1, y1), (x2, y2) = best_pair
@@ -54,57 +249,194 @@ def part1(tiles, debug=False):
     return find_largest_rectangle(tiles, debug=debug)
 
 
+def _rasterise_boundary(xs, ys, min_x, max_x, min_y, max_y):
+    """Mark the polygon boundary in a bool grid indexed [x - min_x, y - min_y], one slice per edge."""
+    mask = np.zeros((max_x - min_x + 1, max_y - min_y + 1), dtype=bool)
+    for i in range(len(xs)):
+        x1, y1 = xs[i], ys[i]
+        x2, y2 = xs[(i + 1) % len(xs)], ys[(i + 1) % len(xs)]  # Wrap around to first tile
+        mask[x1 - min_x, y1 - min_y] = True
+        if x1 == x2:  # Vertical line
+            mask[x1 - min_x, min(y1, y2) - min_y:max(y1, y2) - min_y + 1] = True
+        elif y1 == y2:  # Horizontal line
+            mask[min(x1, x2) - min_x:max(x1, x2) - min_x + 1, y1 - min_y] = True
+    return mask
+
+
 def build_polygon_boundary(tiles):
-    """Build set of all tiles on the polygon boundary (red tiles + green connecting tiles)."""
-    boundary = set(tiles)
+    """
+    Build the set of all tiles on the polygon boundary (red tiles + green connecting tiles).
+    
+    When the bounding box has at most BOUNDARY_GRID_CELLS tiles the boundary is
+    marked in a bool grid with one slice write per edge and returned as a
+    TileGrid, which supports the same `in`/len/iteration as a set. Larger
+    boxes fall back to a set of (x, y) tuples so memory tracks the perimeter.
+    """
+    # Plain int lists keep the per-edge loop off NumPy scalars
+    xs, ys = (column.tolist() for column in tile_columns(tiles))
+    if xs:
+        min_x, max_x = min(xs), max(xs)
+        min_y, max_y = min(ys), max(ys)
+        if (max_x - min_x + 1) * (max_y - min_y + 1) <= BOUNDARY_GRID_CELLS:
+            return TileGrid(_rasterise_boundary(xs, ys, min_x, max_x, min_y, max_y), min_x, min_y)
+    
+    boundary = set(zip(xs, ys))
     
     # Connect consecutive red tiles with straight lines of green tiles
-    for i in range(len(tiles)):
-        x1, y1 = tiles[i]
-        x2, y2 = tiles[(i + 1) % len(tiles)]  # Wrap around to first tile
+    for i in range(len(xs)):
+        x1, y1 = xs[i], ys[i]
+        x2, y2 = xs[(i + 1) % len(xs)], ys[(i + 1) % len(xs)]  # Wrap around to first tile
         
-        # Add all tiles between these two red tiles
+        # Add all tiles between these two red tiles in one C-level update
         if x1 == x2:  # Vertical line
-            for y in range(min(y1, y2), max(y1, y2) + 1):
-                boundary.add((x1, y))
+            boundary.update(zip(repeat(x1), range(min(y1, y2), max(y1, y2) + 1)))
         elif y1 == y2:  # Horizontal line
-            for x in range(min(x1, x2), max(x1, x2) + 1):
-                boundary.add((x, y1))
+            boundary.update(zip(range(min(x1, x2), max(x1, x2) + 1), repeat(y1)))
     
     return boundary
 
 
-def point_in_polygon(x, y, polygon_vertices):
-    """Check if point (x, y) is inside polygon using ray casting algorithm."""
-    n = len(polygon_vertices)
+class PolygonEdges:
+    """
+    Edge arrays of a polygon, derived once and shared by every ray cast.
+    
+    Holds the vertex columns (xs, ys) alongside per-edge arrays so repeated
+    point-in-polygon tests skip re-rolling vertices and re-checking whether
+    the polygon is rectilinear.
+    """
+    
+    def __init__(self, polygon_vertices):
+        self.xs, self.ys = polygon_arrays(polygon_vertices)
+        x2, y2 = np.roll(self.xs, -1), np.roll(self.ys, -1)
+        self.rectilinear = bool(np.all((self.xs == x2) | (self.ys == y2)))
+        
+        if self.rectilinear:
+            # A horizontal ray can only cross vertical edges, at the edge's own x
+            vertical = self.xs == x2
+            self.x1 = self.xs[vertical]
+            self.y_lo = np.minimum(self.ys, y2)[vertical]
+            self.y_hi = np.maximum(self.ys, y2)[vertical]
+        else:
+            # Store the slope as dx/|dy| with dy's sign folded into dx, so the
+            # crossing test can cross-multiply and stay in exact integers
+            dy = y2 - self.ys
+            self.x1, self.y1, self.y2 = self.xs, self.ys, y2
+            self.dx = (x2 - self.xs) * np.sign(dy)
+            self.dy = np.abs(dy)
+    
+    def contains(self, xs, ys):
+        """
+        Even-odd ray cast for arrays of points against every edge at once.
+        
+        Points are broadcast against edges as a (points, edges) matrix.
+        Returns a boolean array, True where the point is inside.
+        """
+        xs = np.asarray(xs, dtype=np.int64)[:, None]
+        ys = np.asarray(ys, dtype=np.int64)[:, None]
+        
+        if self.rectilinear:
+            crosses = (xs < self.x1) & (self.y_lo <= ys) & (ys < self.y_hi)
+        else:
+            # Edge straddles the horizontal ray through the point (half-open in y)
+            straddles = (self.y1 <= ys) != (self.y2 <= ys)
+            crosses = straddles & ((xs - self.x1) * self.dy < (ys - self.y1) * self.dx)
+        
+        return np.bitwise_xor.reduce(crosses, axis=1)
+
+
+def _points_in_polygon(xs, ys, polygon_vertices):
+    """Even-odd ray cast for arrays of points; see PolygonEdges.contains."""
+    if not isinstance(polygon_vertices, PolygonEdges):
+        polygon_vertices = PolygonEdges(polygon_vertices)
+    return polygon_vertices.contains(xs, ys)
+
+
+def _point_in_polygon_kernel(x, y, poly_x, poly_y):
+    """
+    Scalar even-odd ray cast over vertex arrays, written so Numba can compile it.
+    
+    Uses the same half-open crossing rule and exact integer comparison as
+    PolygonEdges.contains.
+    """
+    n = len(poly_x)
     inside = False
-    
-    p1x, p1y = polygon_vertices[0]
-    for i in range(1, n + 1):
-        p2x, p2y = polygon_vertices[i % n]
-        if y > min(p1y, p2y):
-            if y <= max(p1y, p2y):
-                if x <= max(p1x, p2x):
-                    if p1y != p2y:
-                        xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                    if p1x == p2x or x <= xinters:
-                        inside = not inside
-        p1x, p1y = p2x, p2y
-    
+    for i in range(n):
+        x1, y1 = poly_x[i], poly_y[i]
+        x2, y2 = poly_x[(i + 1) % n], poly_y[(i + 1) % n]
+        if (y1 <= y) != (y2 <= y):
+            # x < crossing, cross-multiplied with dy made positive
+            dx, dy = x2 - x1, y2 - y1
+            if dy < 0:
+                dx, dy = -dx, -dy
+            if (x - x1) * dy < (y - y1) * dx:
+                inside = not inside
     return inside
 
 
+if njit is not None:
+    # Parsed tile columns are read-only views, so compile for those as well
+    _readonly_int64 = types.Array(types.int64, 1, 'A', readonly=True)
+    _point_in_polygon_nb = njit(
+        ['boolean(int64, int64, int64[:], int64[:])',
+         types.boolean(types.int64, types.int64, _readonly_int64, _readonly_int64)], cache=True
+    )(_point_in_polygon_kernel)
+else:
+    _point_in_polygon_nb = None
+
+
+def point_in_polygon(x, y, polygon_vertices):
+    """
+    Check if point (x, y) is inside polygon using ray casting algorithm.
+    
+    The polygon may be a list of (x, y) vertices, (xs, ys) columns or a
+    PolygonEdges; callers testing many points should pass a PolygonEdges so
+    the edge arrays are only built once.
+    """
+    if _point_in_polygon_nb is not None:
+        poly_x, poly_y = polygon_arrays(polygon_vertices)
+        return _point_in_polygon_nb(x, y, poly_x, poly_y)
+    if theater_kernels is not None:
+        poly_x, poly_y = polygon_arrays(polygon_vertices)
+        return theater_kernels.point_in_polygon(x, y, poly_x, poly_y)
+    return bool(_points_in_polygon([x], [y], polygon_vertices)[0])
+
+
+def polygon_centroid(tiles):
+    """
+    Area centroid of the polygon from the shoelace formula, or None if it has no area.
+    
+    Unlike the mean of the vertices this is not pulled towards runs of
+    closely spaced corners.
+    """
+    xs, ys = polygon_arrays(tiles)
+    x2, y2 = np.roll(xs, -1), np.roll(ys, -1)
+    cross = xs * y2 - x2 * ys
+    twice_area = int(cross.sum())
+    if twice_area == 0:
+        return None
+    cx = int(((xs + x2) * cross).sum()) / (3 * twice_area)
+    cy = int(((ys + y2) * cross).sum()) / (3 * twice_area)
+    return cx, cy
+
+
 def find_interior_point(tiles, boundary):
     """Find a point that's definitely inside the polygon."""
-    # Use centroid of red tiles as starting point
-    cx = sum(t[0] for t in tiles) // len(tiles)
-    cy = sum(t[1] for t in tiles) // len(tiles)
+    # Start from the area centroid, falling back to the mean of the red tiles
+    centroid = polygon_centroid(tiles)
+    if centroid is not None:
+        cx, cy = round(centroid[0]), round(centroid[1])
+    else:
+        cx = sum(t[0] for t in tiles) // len(tiles)
+        cy = sum(t[1] for t in tiles) // len(tiles)
     
-    # If centroid is not on boundary, it's likely inside
-    if (cx, cy) not in boundary and point_in_polygon(cx, cy, tiles):
-        return (cx, cy)
+    # The centroid or one of its lattice neighbours is inside for convex and
+    # most other shapes
+    for dx, dy in ((0, 0), (1, 0), (0, 1), (-1, 0), (0, -1)):
+        x, y = cx + dx, cy + dy
+        if (x, y) not in boundary and point_in_polygon(x, y, tiles):
+            return (x, y)
     
-    # Otherwise, search near centroid
+    # Concave shapes can put the centroid outside, so search near it
     for dx in range(-100, 101):
         for dy in range(-100, 101):
             x, y = cx + dx, cy + dy
@@ -116,59 +448,252 @@ def find_interior_point(tiles, boundary):
 
 def flood_fill_interior(start, boundary, tiles):
     """Flood fill from interior point to find all interior tiles."""
+    polygon = PolygonEdges(tiles)
+    min_x, max_x = int(polygon.xs.min()), int(polygon.xs.max())
+    min_y, max_y = int(polygon.ys.min()), int(polygon.ys.max())
+    
+    # A rectilinear boundary walls the fill in on its own; slanted edges
+    # rasterise with diagonal gaps, so there each neighbour is ray cast too
+    check_inside = not polygon.rectilinear
+    
     interior = set()
-    queue = [start]
+    queue = deque([start])
     visited = {start}
     
     while queue:
-        x, y = queue.pop(0)
+        x, y = queue.popleft()
         interior.add((x, y))
         
-        # Check 4 neighbors
+        # Check 4 neighbors, never leaving the bounding box
         for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
             nx, ny = x + dx, y + dy
+            if not (min_x <= nx <= max_x and min_y <= ny <= max_y):
+                continue
             if (nx, ny) not in visited and (nx, ny) not in boundary:
-                # Verify it's actually inside (boundary check might miss some)
-                if point_in_polygon(nx, ny, tiles):
-                    visited.add((nx, ny))
-                    queue.append((nx, ny))
+                if check_inside and not point_in_polygon(nx, ny, polygon):
+                    continue
+                visited.add((nx, ny))
+                queue.append((nx, ny))
     
     return interior
 
 
-def build_valid_tiles(tiles, debug=False):
-    """Build set of all valid tiles (red + green boundary + green interior)."""
-    # Start with boundary tiles
-    boundary = build_polygon_boundary(tiles)
+def pack_bits(mask):
+    """Pack each row of a 2D bool mask into little-endian uint64 words (bit k = column k)."""
+    packed = np.packbits(mask, axis=1, bitorder='little')
+    pad = -packed.shape[1] % 8
+    if pad:
+        packed = np.pad(packed, ((0, 0), (0, pad)))
+    return np.ascontiguousarray(packed).view('<u8')
+
+
+def _row_all_set_kernel(words, lo, hi):
+    """True if bits lo..hi (inclusive) of a packed row are all set, 64 bits per step."""
+    full = ~np.uint64(0)
+    first = lo >> 6
+    last = hi >> 6
+    head = full << np.uint64(lo & 63)
+    tail = full >> np.uint64(63 - (hi & 63))
+    
+    if first == last:
+        both = head & tail
+        return words[first] & both == both
+    if words[first] & head != head:
+        return False
+    for w in range(first + 1, last):
+        if words[w] != full:
+            return False
+    return words[last] & tail == tail
+
+
+def _rectangle_all_set_kernel(rows, cols, i1, i2, j1, j2):
+    """Check an inclusive block of packed rows is all set, edges first."""
+    if not (_row_all_set_nb(rows[i1], j1, j2) and _row_all_set_nb(rows[i2], j1, j2)
+            and _row_all_set_nb(cols[j1], i1, i2) and _row_all_set_nb(cols[j2], i1, i2)):
+        return False
+    for i in range(i1 + 1, i2):
+        if not _row_all_set_nb(rows[i], j1, j2):
+            return False
+    return True
+
+
+if njit is not None:
+    _row_all_set_nb = njit('boolean(uint64[:], int64, int64)', cache=True)(_row_all_set_kernel)
+    _rectangle_all_set_nb = njit(
+        'boolean(uint64[:, :], uint64[:, :], int64, int64, int64, int64)', cache=True
+    )(_rectangle_all_set_kernel)
+else:
+    _row_all_set_nb = None
+    _rectangle_all_set_nb = None
+
+
+class TileGrid:
+    """Dense boolean grid over a bounding box that behaves like a set of (x, y) tiles."""
     
-    if debug:
-        print(f"Boundary has {len(boundary)} tiles")
+    def __init__(self, mask, min_x, min_y):
+        self.mask = mask
+        self.min_x = min_x
+        self.min_y = min_y
+        
+        # Rectangle indexes are built on first use, so grids only used for
+        # membership (like the polygon boundary) never pay for them
+        self.packed_rows = self.packed_cols = self.prefix = None
+    
+    def _build_index(self):
+        # Bit-packed copies along both axes let the compiled check test 64 tiles per word;
+        # without Numba or Cython a zero-padded summed-area table answers each check in O(1)
+        mask = self.mask
+        if _rectangle_all_set_nb is not None:
+            self.packed_rows = pack_bits(mask)
+            self.packed_cols = pack_bits(mask.T)
+        else:
+            dtype = np.int32 if mask.size < 2 ** 31 else np.int64
+            self.prefix = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=dtype)
+            np.cumsum(mask, axis=0, dtype=dtype, out=self.prefix[1:, 1:])
+            np.cumsum(self.prefix[1:, 1:], axis=1, out=self.prefix[1:, 1:])
+    
+    def __contains__(self, tile):
+        i = tile[0] - self.min_x
+        j = tile[1] - self.min_y
+        if 0 <= i < self.mask.shape[0] and 0 <= j < self.mask.shape[1]:
+            return bool(self.mask[i, j])
+        return False
+    
+    def __len__(self):
+        return int(self.mask.sum())
+    
+    def __iter__(self):
+        xs, ys = np.nonzero(self.mask)
+        return zip((xs + self.min_x).tolist(), (ys + self.min_y).tolist())
+    
+    def contains_rectangle(self, min_x, min_y, max_x, max_y):
+        """Check every tile of an inclusive rectangle is set."""
+        i1, i2 = min_x - self.min_x, max_x - self.min_x
+        j1, j2 = min_y - self.min_y, max_y - self.min_y
+        if i1 < 0 or j1 < 0 or i2 >= self.mask.shape[0] or j2 >= self.mask.shape[1]:
+            return False
+        
+        # The Cython scan exits at the first unset tile and needs no index
+        if _rectangle_all_set_nb is None and theater_kernels is not None:
+            return theater_kernels.rectangle_all_set(self.mask.view(np.uint8), i1, i2, j1, j2)
+        
+        if self.packed_rows is None and self.prefix is None:
+            self._build_index()
+        
+        if self.packed_rows is not None:
+            return _rectangle_all_set_nb(self.packed_rows, self.packed_cols, i1, i2, j1, j2)
+        
+        # Inclusion-exclusion over the summed-area table counts the set tiles
+        p = self.prefix
+        count = p[i2 + 1, j2 + 1] - p[i1, j2 + 1] - p[i2 + 1, j1] + p[i1, j1]
+        return bool(count == (i2 - i1 + 1) * (j2 - j1 + 1))
+
+
+def _fill_exterior_kernel(grid):
+    """
+    Mark every 0 cell 4-connected to grid[0, 0] as 2, in place.
+    
+    Cells are pushed as flat indexes x * height + y onto a stack that starts
+    small and doubles on demand, so Numba can compile it and memory follows
+    the fill front rather than the grid size. Each cell is pushed at most
+    once because it is marked as it is pushed.
+    """
+    width, height = grid.shape
+    stack = np.empty(max(64, width + height), dtype=np.int64)
+    stack[0] = 0
+    grid[0, 0] = 2
+    top = 1
+    
+    while top > 0:
+        # A pop pushes at most four neighbours, so make room for them first
+        if top + 4 > len(stack):
+            grown = np.empty(2 * len(stack), dtype=np.int64)
+            grown[:top] = stack[:top]
+            stack = grown
+        
+        top -= 1
+        index = stack[top]
+        x = index // height
+        y = index - x * height
+        if x > 0 and grid[x - 1, y] == 0:
+            grid[x - 1, y] = 2
+            stack[top] = index - height
+            top += 1
+        if x < width - 1 and grid[x + 1, y] == 0:
+            grid[x + 1, y] = 2
+            stack[top] = index + height
+            top += 1
+        if y > 0 and grid[x, y - 1] == 0:
+            grid[x, y - 1] = 2
+            stack[top] = index - 1
+            top += 1
+        if y < height - 1 and grid[x, y + 1] == 0:
+            grid[x, y + 1] = 2
+            stack[top] = index + 1
+            top += 1
+
+
+if njit is not None:
+    _fill_exterior_nb = njit('void(uint8[:, :])', cache=True)(_fill_exterior_kernel)
+else:
+    _fill_exterior_nb = None
+
+
+def build_valid_tiles(tiles, debug=False):
+    """
+    Build grid of all valid tiles (red + green boundary + green interior).
     
-    # Find an interior point and flood fill from it
-    if debug:
-        print(f"Finding interior point...")
+    The grid covers the whole bounding box, so boxes with more than
+    BOUNDARY_GRID_CELLS tiles are refused; part2 never needs the full grid.
+    """
+    columns = tile_columns(tiles)
+    xs, ys = (column.tolist() for column in columns)
+    min_x, max_x = min(xs), max(xs)
+    min_y, max_y = min(ys), max(ys)
     
-    interior_start = find_interior_point(tiles, boundary)
+    cells = (max_x - min_x + 1) * (max_y - min_y + 1)
+    if cells > BOUNDARY_GRID_CELLS:
+        raise ValueError(f"Bounding box has {cells} tiles, more than BOUNDARY_GRID_CELLS "
+                         f"({BOUNDARY_GRID_CELLS}); use part2's lazy search instead")
     
-    if interior_start is None:
-        if debug:
-            print(f"No interior found - polygon might be just the boundary")
-        return boundary
+    mask = _rasterise_boundary(xs, ys, min_x, max_x, min_y, max_y)
     
     if debug:
-        print(f"Starting flood fill from {interior_start}...")
+        print(f"Boundary has {int(mask.sum())} tiles")
     
-    interior = flood_fill_interior(interior_start, boundary, tiles)
+    rectilinear = all(xs[i] == xs[i - 1] or ys[i] == ys[i - 1] for i in range(len(xs)))
+    
+    if _fill_exterior_nb is not None and rectilinear:
+        # Flood the outside from a one-tile border; whatever it cannot reach is inside
+        if debug:
+            print(f"Flood filling exterior of {mask.size} candidate tiles...")
+        grid = np.zeros((mask.shape[0] + 2, mask.shape[1] + 2), dtype=np.uint8)
+        grid[1:-1, 1:-1] = mask
+        _fill_exterior_nb(grid)
+        inside = grid[1:-1, 1:-1] == 0
+    else:
+        # Ray cast the bounding box a block of tiles at a time so the
+        # (tiles, edges) crossing matrix never exceeds PARALLEL_PAIRS entries
+        if debug:
+            print(f"Ray casting {mask.size} candidate tiles...")
+        polygon = PolygonEdges(columns)
+        height = mask.shape[1]
+        block = max(1, PARALLEL_PAIRS // max(1, len(polygon.x1)))
+        inside = np.empty(mask.size, dtype=bool)
+        for start in range(0, mask.size, block):
+            flat = np.arange(start, min(start + block, mask.size), dtype=np.int64)
+            inside[start:start + block] = polygon.contains(min_x + flat // height, min_y + flat % height)
+        inside = inside.reshape(mask.shape)
     
     if debug:
-        print(f"Found {len(interior)} interior tiles")
+        print(f"Found {int((inside & ~mask).sum())} interior tiles")
     
-    valid_tiles = boundary | interior
+    mask |= inside
     
     if debug:
-        print(f"Total valid tiles (red + green): {len(valid_tiles)}")
+        print(f"Total valid tiles (red + green): {int(mask.sum())}")
     
-    return valid_tiles
+    return TileGrid(mask, min_x, min_y)
 
 
 def is_rectangle_valid(x1, y1, x2, y2, valid_tiles):
@@ -176,6 +701,10 @@ def is_rectangle_valid(x1, y1, x2, y2, valid_tiles):
     min_x, max_x = min(x1, x2), max(x1, x2)
     min_y, max_y = min(y1, y2), max(y1, y2)
     
+    # A dense grid answers exactly with a few array slice reductions
+    if isinstance(valid_tiles, TileGrid):
+        return valid_tiles.contains_rectangle(min_x, min_y, max_x, max_y)
+    
     # For small rectangles, check every tile
     width = max_x - min_x + 1
     height = max_y - min_y + 1
@@ -209,10 +738,14 @@ def is_rectangle_valid(x1, y1, x2, y2, valid_tiles):
 
 
 def find_largest_valid_rectangle(tiles, valid_tiles, debug=False):
-    """Find largest rectangle using only red/green tiles."""
+    """Find largest rectangle using only red/green tiles, given as (x, y) pairs or (xs, ys) columns."""
+    # Index plain int lists directly rather than unpacking a tuple pair per step
+    xs, ys = (column.tolist() for column in tile_columns(tiles))
+    num_tiles = len(xs)
+    
     max_area = 0
     best_pair = None
-    total_pairs = len(tiles) * (len(tiles) - 1) // 2
+    total_pairs = num_tiles * (num_tiles - 1) // 2
     
     if debug:
         print(f"\nChecking {total_pairs} tile pairs for valid rectangles...")
@@ -221,28 +754,29 @@ def find_largest_valid_rectangle(tiles, valid_tiles, debug=False):
     valid_count = 0
     skipped = 0
     
-    for i, ((x1, y1), (x2, y2)) in enumerate(combinations(tiles, 2)):
-        checked += 1
-        
-        # Calculate potential area
-        width = abs(x2 - x1) + 1
-        height = abs(y2 - y1) + 1
-        area = width * height
-        
-        # Skip if this can't beat current max
-        if area <= max_area:
-            skipped += 1
-            continue
-        
-        # Check if rectangle is valid
-        if is_rectangle_valid(x1, y1, x2, y2, valid_tiles):
-            valid_count += 1
+    for i in range(num_tiles):
+        x1, y1 = xs[i], ys[i]
+        for j in range(i + 1, num_tiles):
+            x2, y2 = xs[j], ys[j]
+            checked += 1
+            
+            # Calculate potential area
+            width = abs(x2 - x1) + 1
+            height = abs(y2 - y1) + 1
+            area = width * height
+            
+            # Skip if this can't beat current max
+            if area <= max_area:
+                skipped += 1
+                continue
             
-            if area > max_area:
+            # Check if rectangle is valid
+            if is_rectangle_valid(x1, y1, x2, y2, valid_tiles):
+                valid_count += 1
                 max_area = area
                 best_pair = ((x1, y1), (x2, y2))
                 if debug:
-                    print(f"  New max at pair {i+1}: ({x1},{y1}) to ({x2},{y2}) = {width}×{height} = {area}")
+                    print(f"  New max at pair {checked}: ({x1},{y1}) to ({x2},{y2}) = {width}×{height} = {area}")
     
     if debug:
         print(f"\nChecked {checked} pairs, skipped {skipped}, {valid_count} were valid")
@@ -254,11 +788,32 @@ def find_largest_valid_rectangle(tiles, valid_tiles, debug=False):
     return max_area
 
 
-def is_rectangle_valid_lazy(x1, y1, x2, y2, boundary, tiles):
-    """Check if rectangle is valid without precomputing all interior tiles."""
+def _tile_allowed(x, y, boundary, polygon, pip_cache):
+    """True if (x, y) is on the boundary or inside the polygon, memoising ray casts."""
+    if (x, y) in boundary:
+        return True
+    inside = pip_cache.get((x, y))
+    if inside is None:
+        inside = pip_cache[(x, y)] = point_in_polygon(x, y, polygon)
+    return inside
+
+
+def is_rectangle_valid_lazy(x1, y1, x2, y2, boundary, tiles, pip_cache=None):
+    """
+    Check if rectangle is valid without precomputing all interior tiles.
+    
+    Point-in-polygon results are memoised in pip_cache when given, so sample
+    points shared between candidate rectangles are only ray cast once.
+    """
     min_x, max_x = min(x1, x2), max(x1, x2)
     min_y, max_y = min(y1, y2), max(y1, y2)
     
+    if pip_cache is None:
+        pip_cache = {}
+    
+    def is_valid(x, y):
+        return _tile_allowed(x, y, boundary, tiles, pip_cache)
+    
     # Sample points in the rectangle
     width = max_x - min_x + 1
     height = max_y - min_y + 1
@@ -267,7 +822,7 @@ def is_rectangle_valid_lazy(x1, y1, x2, y2, boundary, tiles):
     if width * height <= 1000:
         for x in range(min_x, max_x + 1):
             for y in range(min_y, max_y + 1):
-                if (x, y) not in boundary and not point_in_polygon(x, y, tiles):
+                if not is_valid(x, y):
                     return False
         return True
     
@@ -275,71 +830,82 @@ def is_rectangle_valid_lazy(x1, y1, x2, y2, boundary, tiles):
     # Check corners
     for x in [min_x, max_x]:
         for y in [min_y, max_y]:
-            if (x, y) not in boundary and not point_in_polygon(x, y, tiles):
+            if not is_valid(x, y):
                 return False
     
     # Check edges
     step = max(1, min(width, height) // 50)
     for x in range(min_x, max_x + 1, step):
         for y in [min_y, max_y]:
-            if (x, y) not in boundary and not point_in_polygon(x, y, tiles):
+            if not is_valid(x, y):
                 return False
     
     for y in range(min_y, max_y + 1, step):
         for x in [min_x, max_x]:
-            if (x, y) not in boundary and not point_in_polygon(x, y, tiles):
+            if not is_valid(x, y):
                 return False
     
     # Sample interior
     for x in range(min_x, max_x + 1, step):
         for y in range(min_y, max_y + 1, step):
-            if (x, y) not in boundary and not point_in_polygon(x, y, tiles):
+            if not is_valid(x, y):
                 return False
     
     return True
 
 
 def find_largest_valid_rectangle_lazy(tiles, boundary, debug=False):
-    """Find largest rectangle without precomputing all interior tiles."""
-    max_area = 0
-    best_pair = None
-    total_pairs = len(tiles) * (len(tiles) - 1) // 2
+    """
+    Find largest rectangle without precomputing all interior tiles.
+    
+    Tiles may be (x, y) pairs or (xs, ys) columns. Candidate pairs are
+    visited in descending area order, so the first valid rectangle found is
+    the answer.
+    """
+    # Build the edge arrays once and share ray-cast results across rectangles
+    polygon = PolygonEdges(tiles)
+    pip_cache = {}
+    
+    xs, ys = polygon.xs, polygon.ys
+    num_tiles = len(xs)
+    total_pairs = num_tiles * (num_tiles - 1) // 2
     
     if debug:
         print(f"\nChecking {total_pairs} tile pairs for valid rectangles...")
     
+    # Score every pair up front; a stable sort keeps ties in pair order
+    first, second = np.triu_indices(num_tiles, k=1)
+    areas = ((np.abs(xs[first] - xs[second]) + 1) *
+             (np.abs(ys[first] - ys[second]) + 1))
+    order = np.argsort(-areas, kind='stable')
+    x_list, y_list = xs.tolist(), ys.tolist()
+    
+    max_area = 0
+    best_pair = None
     checked = 0
-    valid_count = 0
-    skipped = 0
     
-    for i, ((x1, y1), (x2, y2)) in enumerate(combinations(tiles, 2)):
+    for k in order:
         checked += 1
         
         if debug and checked % 10000 == 0:
             print(f"  Progress: {checked}/{total_pairs} pairs checked...")
         
-        # Calculate potential area
-        width = abs(x2 - x1) + 1
-        height = abs(y2 - y1) + 1
-        area = width * height
+        i, j = first[k], second[k]
+        x1, y1, x2, y2 = x_list[i], y_list[i], x_list[j], y_list[j]
         
-        # Skip if this can't beat current max
-        if area <= max_area:
-            skipped += 1
+        # Cheap early reject: the two corners that are not red tiles must
+        # themselves be valid before any sampling is worth doing
+        if not (_tile_allowed(x1, y2, boundary, polygon, pip_cache)
+                and _tile_allowed(x2, y1, boundary, polygon, pip_cache)):
             continue
         
-        # Check if rectangle is valid
-        if is_rectangle_valid_lazy(x1, y1, x2, y2, boundary, tiles):
-            valid_count += 1
-            
-            if area > max_area:
-                max_area = area
-                best_pair = ((x1, y1), (x2, y2))
-                if debug:
-                    print(f"  New max at pair {i+1}: ({x1},{y1}) to ({x2},{y2}) = {width}×{height} = {area}")
+        if is_rectangle_valid_lazy(x1, y1, x2, y2, boundary, polygon, pip_cache):
+            max_area = int(areas[k])
+            best_pair = ((x1, y1), (x2, y2))
+            break
     
     if debug:
-        print(f"\nChecked {checked} pairs, skipped {skipped}, {valid_count} were valid")
+        print(f"\nChecked {checked} pairs, skipped {total_pairs - checked}")
         if best_pair:
             (x1, y1), (x2, y2) = best_pair
             print(f"Best valid rectangle: ({x1},{y1}) to ({x2},{y2})")
@@ -0,0 +1,45 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Ahead-of-time compiled kernels for theater.py, used when Numba is missing.
+
+Build in place with:  cythonize -i theater_kernels.pyx
+"""
+
+
+def point_in_polygon(long long x, long long y, const long long[::1] poly_x, const long long[::1] poly_y):
+    """Scalar even-odd ray cast, mirroring theater._point_in_polygon_kernel."""
+    cdef Py_ssize_t n = poly_x.shape[0]
+    cdef Py_ssize_t i, k
+    cdef long long x1, y1, x2, y2, dx, dy
+    cdef bint inside = False
+
+    for i in range(n):
+        k = i + 1 if i + 1 < n else 0
+        x1, y1 = poly_x[i], poly_y[i]
+        x2, y2 = poly_x[k], poly_y[k]
+        if (y1 <= y) != (y2 <= y):
+            dx, dy = x2 - x1, y2 - y1
+            if dy < 0:
+                dx, dy = -dx, -dy
+            if (x - x1) * dy < (y - y1) * dx:
+                inside = not inside
+    return inside
+
+
+cdef bint _line_all_set(const unsigned char[:, ::1] mask, Py_ssize_t i1, Py_ssize_t i2,
+                        Py_ssize_t j1, Py_ssize_t j2):
+    cdef Py_ssize_t i, j
+    for i in range(i1, i2 + 1):
+        for j in range(j1, j2 + 1):
+            if not mask[i, j]:
+                return False
+    return True
+
+
+def rectangle_all_set(const unsigned char[:, ::1] mask, Py_ssize_t i1, Py_ssize_t i2,
+                      Py_ssize_t j1, Py_ssize_t j2):
+    """Check an inclusive block of a uint8 mask is all set, edges first."""
+    if not (_line_all_set(mask, i1, i2, j1, j1) and _line_all_set(mask, i1, i2, j2, j2)
+            and _line_all_set(mask, i1, i1, j1, j2) and _line_all_set(mask, i2, i2, j1, j2)):
+        return False
+    return _line_all_set(mask, i1 + 1, i2 - 1, j1 + 1, j2 - 1)
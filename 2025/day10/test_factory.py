@@ -3,8 +3,14 @@
 Tests for Day 10: Factory solution
 """
 
+import os
+import random
+
+import numpy as np
 import pytest
-from factory import parse_machine, solve_gf2_system, part1, parse_input
+import factory
+from factory import (parse_machine, parse_machine_bits, solve_gf2_batch, solve_gf2_bits, solve_gf2_system,
+                     part1, parse_input)
 
 
 def test_parse_machine():
@@ -16,6 +22,100 @@ def test_parse_machine():
     assert buttons == [[3], [1, 3], [2], [2, 3], [0, 2], [0, 1]]
 
 
+def test_parse_machine_bits():
+    """Test parsing of machine specifications into bitmasks."""
+    line = "[.##.] (3) (1,3) (2) (2,3) (0,2) (0,1) {3,5,4,7}"
+    target_bits, button_masks = parse_machine_bits(line)
+    
+    assert target_bits == 0b0110
+    assert button_masks == [0b1000, 0b1010, 0b0100, 0b1100, 0b0101, 0b0011]
+
+
+def test_parse_input_cached_until_file_changes(tmp_path):
+    """Test repeated parses share one tuple and a rewritten file is read again."""
+    path = tmp_path / 'machines.txt'
+    path.write_text("[.#] (1) {1}\n")
+    first = parse_input(str(path))
+    
+    assert parse_input(str(path)) is first
+    assert first == ("[.#] (1) {1}",)
+    
+    path.write_text("[#.] (0) {1}\n# comment\n")
+    os.utime(path, (0, os.path.getmtime(path) + 1))
+    assert parse_input(str(path)) == ("[#.] (0) {1}",)
+
+
+def test_solve_gf2_bits_example1():
+    """Test first example machine with packed bitmasks."""
+    target_bits, button_masks = parse_machine_bits("[.##.] (3) (1,3) (2) (2,3) (0,2) (0,1) {3,5,4,7}")
+    
+    result = solve_gf2_bits(target_bits, button_masks)
+    assert result == 2
+
+
+def test_solve_gf2_bits_without_numba(monkeypatch):
+    """Test the pure-Python bitmask path agrees with the compiled kernel."""
+    target_bits, button_masks = parse_machine_bits("[...#.] (0,2,3,4) (2,3) (0,4) (0,1,2) (1,2,3,4) {7,5,12,7,2}")
+    expected = solve_gf2_bits(target_bits, button_masks)
+    
+    monkeypatch.setattr(factory, '_solve_gf2_nb', None)
+    assert solve_gf2_bits(target_bits, button_masks) == expected == 3
+
+
+def test_solve_gf2_batch_matches_per_machine():
+    """Test the batched solver gives each machine's own answer, in order."""
+    machines = [parse_machine_bits(line) for line in parse_input('example.txt')]
+    machines.append((0b01, [0b10]))  # Unreachable target
+    
+    assert solve_gf2_batch(machines) == [2, 3, 2, -1]
+
+
+def test_kernel_defers_large_nullity():
+    """Test the compiled solver refuses to walk a coset wider than 2^KERNEL_MAX_NULLITY."""
+    columns = np.ones(factory.KERNEL_MAX_NULLITY + 2, dtype=np.uint64)
+    
+    assert factory._solve_gf2_kernel(columns, np.uint64(1)) == factory._NULLITY_TOO_LARGE
+    assert factory._solve_gf2_kernel(columns[:4], np.uint64(1)) == 1
+    assert factory._solve_gf2_kernel(columns, np.uint64(2)) == -1  # Unreachable is still reported
+
+
+def test_large_nullity_falls_back_to_python(monkeypatch):
+    """Test machines the kernel defers are solved by the pure-Python path, alone or in a batch."""
+    machines = [parse_machine_bits(line) for line in parse_input('example.txt')]
+    wide = (0b1, [0b1] * (factory.KERNEL_MAX_NULLITY + 2))
+    
+    monkeypatch.setattr(factory, '_solve_gf2_nb', lambda columns, target: factory._NULLITY_TOO_LARGE)
+    assert solve_gf2_bits(*machines[0]) == 2
+    
+    monkeypatch.undo()
+    deferred = []
+    monkeypatch.setattr(factory, 'solve_gf2_bits', lambda target, masks: deferred.append(masks) or 1)
+    assert solve_gf2_batch(machines + [wide]) == [2, 3, 2, 1]
+    assert deferred == ([wide[1]] if factory._solve_gf2_batch_nb is not None else [m[1] for m in machines] + [wide[1]])
+
+
+def test_gaussian_m4ri_matches_column_elimination(monkeypatch):
+    """Test the M4RI block reduction gives the same answers as the per-column loop."""
+    rng = random.Random(10)
+    machines = [parse_machine(line) for line in parse_input('example.txt')]
+    machines.append(([1, 0], [[1]]))  # Unreachable target
+    for _ in range(20):
+        num_lights = rng.randint(1, 20)
+        machines.append(([rng.randint(0, 1) for _ in range(num_lights)],
+                         [rng.sample(range(num_lights), rng.randint(1, num_lights)) for _ in range(12)]))
+    
+    expected = [factory.solve_gf2_gaussian(target, buttons) for target, buttons in machines]
+    monkeypatch.setattr(factory, 'M4RI_MIN_COLUMNS', 1)
+    assert [factory.solve_gf2_gaussian(target, buttons) for target, buttons in machines] == expected
+    assert expected[:4] == [2, 3, 2, -1]
+
+
+def test_solve_gf2_bits_impossible():
+    """Test bitmask solver when the target is outside the buttons' span."""
+    result = solve_gf2_bits(0b01, [0b10])
+    assert result == -1
+
+
 def test_solve_gf2_system_example1():
     """Test first example machine."""
     target = [0, 1, 1, 0]  # [.##.]
@@ -43,6 +143,15 @@ def test_solve_gf2_system_example3():
     assert result == 2
 
 
+def test_solve_gf2_system_many_buttons():
+    """Test a 22-button system that brute force would need 2^22 passes for."""
+    data = parse_input('input-gaussian.txt')
+    target, buttons = parse_machine(data[0])
+    
+    result = solve_gf2_system(target, buttons)
+    assert result == 10
+
+
 def test_solve_factory_example():
     """Test complete example solution."""
     data = parse_input('example.txt')